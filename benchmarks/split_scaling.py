@@ -0,0 +1,31 @@
+"""
+Measures how GeodesicDome.from_frequency() scales with the number of worker processes it splits in,
+and checks that every parallel build is the same to the bit as the serial one.
+
+    PYTHONPATH=src python benchmarks/split_scaling.py [frequency] [max workers]
+"""
+import os
+import sys
+import time
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+
+
+def main(frequency: int = 1000, max_workers: int = None) -> None:
+    max_workers = max_workers or os.cpu_count()
+    expected = None
+    serial = None
+    for workers in [1] + list(range(2, max_workers + 1)):
+        start = time.perf_counter()
+        xyz = GeodesicDome.from_frequency(frequency, workers=workers).get_all_xyz()
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = xyz.tobytes()
+            serial = elapsed
+        same = xyz.tobytes() == expected
+        print(f'workers {workers:3d} {elapsed:8.2f} s  speedup {serial / elapsed:5.2f}  identical {same}')
+        del xyz
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,34 @@
+"""
+Measures the memory the vertices of a geodesic dome and of a plane take, in bytes per vertex.
+
+    PYTHONPATH=src python benchmarks/vertex_memory.py [frequency] [width] [height]
+"""
+import sys
+import tracemalloc
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, Lattice
+
+
+def _measure(build) -> (int, float):
+    tracemalloc.start()
+    manifold = build()
+    vertices = manifold.get_all_vertices()
+    manifold.get_all_xyz()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(vertices), size / len(vertices)
+
+
+def main(frequency: int = 100, width: int = 2000, height: int = 2000) -> None:
+    cases = [
+        (f'GeodesicDome.from_frequency({frequency})', lambda: GeodesicDome.from_frequency(frequency)),
+        (f'Plane({width}, {height}, Hexagonal)', lambda: Plane(width, height, Lattice.Hexagonal)),
+    ]
+    for name, build in cases:
+        n, per_vertex = _measure(build)
+        print(f'{name:40s} {n:10d} vertices {per_vertex:8.1f} bytes/vertex')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,68 @@
+import numpy as np
+from numpy import ndarray
+
+REDUCERS = ('sum', 'mean', 'count', 'max')
+
+
+class BinAccumulator:
+    """
+    Reduces values into bins chunk by chunk, so that the values never have to be in memory all at once.
+    The partial results are kept per bin: sums and counts with np.bincount(), maxima with np.maximum.at().
+    """
+
+    def __init__(self, n_bins: int, reducer: str = 'sum'):
+        """
+        :param n_bins: The number of bins.
+        :param reducer: 'sum', 'mean', 'count' or 'max'.
+        """
+        if reducer not in REDUCERS:
+            raise ValueError(f'unknown reducer: {reducer}')
+        self.n_bins = n_bins
+        self.reducer = reducer
+        self._counts = np.zeros(n_bins, dtype=np.int64)
+        self._values: ndarray = None
+
+    def add(self, bins: ndarray, values: ndarray = None) -> None:
+        """
+        Adds a chunk of values.
+
+        :param bins: (M,) bin index of each value.
+        :param values: (M,) or (M, k) values, None to count the bin indices only.
+        :return: None
+        """
+        bins = np.asarray(bins)
+        self._counts += np.bincount(bins, minlength=self.n_bins)
+        if self.reducer == 'count':
+            return
+        if values is None:
+            raise ValueError(f'{self.reducer} needs values')
+        values = np.asarray(values, dtype=np.float64)
+        if self._values is None:
+            fill = -np.inf if self.reducer == 'max' else 0.0
+            self._values = np.full((self.n_bins,) + values.shape[1:], fill)
+        if self.reducer == 'max':
+            np.maximum.at(self._values, bins, values)
+        elif values.ndim == 1:
+            self._values += np.bincount(bins, weights=values, minlength=self.n_bins)
+        else:
+            for k in range(values.shape[1]):
+                self._values[:, k] += np.bincount(bins, weights=values[:, k], minlength=self.n_bins)
+
+    def result(self) -> ndarray:
+        """
+        Returns the reduced values of the bins.  Empty bins are 0 for 'sum' and 'count', NaN for 'mean' and 'max'.
+
+        :return: (n_bins,) or (n_bins, k) array
+        """
+        if self.reducer == 'count':
+            return self._counts.copy()
+        if self._values is None:
+            # nothing was added
+            return np.full(self.n_bins, 0.0 if self.reducer == 'sum' else np.nan)
+        counts = self._counts.reshape((-1,) + (1,) * (self._values.ndim - 1))
+        if self.reducer == 'sum':
+            return self._values.copy()
+        if self.reducer == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return self._values / counts
+        return np.where(counts > 0, self._values, np.nan)
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Lattice, Plane, Topology
+from vk2gpz.geom.manifold import Manifold
+
+# bump this whenever the arrays a manifold stores, or their meaning, change.
+# entries of other versions are ignored and replaced.
+FORMAT_VERSION = 1
+
+_META = 'meta.json'
+
+# the coordinates are mapped copy-on-write, so that vertices can still be moved in memory.
+# everything else is read-only, the same as when it is built.
+_WRITABLE = ('xyz',)
+
+
+def default_directory() -> str:
+    """
+    Returns $VK2GPZ_GEOM_CACHE, or ~/.cache/vk2gpz-geom if it is not set.
+    """
+    return os.environ.get('VK2GPZ_GEOM_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'vk2gpz-geom'))
+
+
+class MeshCache:
+    """
+    An on-disk cache of built manifolds, keyed by their type and construction parameters.
+
+    Each entry is a directory of .npy files, one per array (coordinates, grid layout, canonical IDs,
+    faces, adjacency), plus a metadata file.  A hit maps the files into memory instead of reading
+    them, so it costs milliseconds whatever the size of the mesh.  The least recently used entries
+    are evicted once the entries take more than max_bytes.
+
+        cache = MeshCache()
+        dome = cache.dome(64)
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = 2 ** 30):
+        """
+        :param directory: Where the entries are kept, default_directory() if None.
+        :param max_bytes: The total size of the entries above which the least recently used ones are removed.
+        """
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def dome(self, frequency: int) -> GeodesicDome:
+        """
+        Returns GeodesicDome.from_frequency(frequency), from the cache if it is there.
+        """
+        return self.get('GeodesicDome', {'frequency': frequency},
+                        lambda: GeodesicDome.from_frequency(frequency),
+                        lambda: GeodesicDome.from_frequency(1))
+
+    def plane(self, x: int, y: int, lattice=Lattice.Hexagonal, topology=Topology.Plane) -> Plane:
+        """
+        Returns Plane(x, y, lattice, topology) with its faces and adjacency from the cache if they are there.
+        """
+        return self.get('Plane', {'x': x, 'y': y, 'lattice': lattice.name, 'topology': topology.name},
+                        lambda: Plane(x, y, lattice, topology),
+                        lambda: Plane(x, y, lattice, topology))
+
+    def get(self, kind: str, params: Dict, build: Callable[[], Manifold],
+            empty: Callable[[], Manifold]) -> Manifold:
+        """
+        Looks up a manifold, builds and stores it on a miss.
+
+        :param kind: The type of the manifold.
+        :param params: The construction parameters, JSON serializable.
+        :param build: Builds the manifold from scratch.
+        :param empty: Creates the manifold the cached arrays are restored into.
+        :return: The manifold.
+        """
+        key = self.key(kind, params)
+        arrays = self._load(key)
+        if arrays is not None:
+            manifold = empty()
+            manifold._restore_cache_arrays(arrays)
+            return manifold
+        manifold = build()
+        self._store(key, kind, params, manifold._cache_arrays())
+        return manifold
+
+    @staticmethod
+    def key(kind: str, params: Dict) -> str:
+        """
+        Returns the name of the entry of a manifold.
+        """
+        text = json.dumps({'kind': kind, 'params': params, 'version': FORMAT_VERSION}, sort_keys=True)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _load(self, key: str) -> Dict[str, ndarray]:
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, _META)) as f:
+                meta = json.load(f)
+            if meta['version'] != FORMAT_VERSION:
+                shutil.rmtree(path, ignore_errors=True)
+                return None
+            arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='c' if name in _WRITABLE else 'r')
+                      for name in meta['arrays']}
+        except (OSError, ValueError, KeyError):
+            return None
+        # mark it as recently used
+        os.utime(os.path.join(path, _META))
+        return arrays
+
+    def _store(self, key: str, kind: str, params: Dict, arrays: Dict[str, ndarray]) -> None:
+        # written next to the final directory and renamed, so other processes never see a partial entry
+        tmp = tempfile.mkdtemp(prefix='.' + key, dir=self.directory)
+        try:
+            for name, a in arrays.items():
+                np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(a))
+            with open(os.path.join(tmp, _META), 'w') as f:
+                json.dump({'version': FORMAT_VERSION, 'kind': kind, 'params': params, 'arrays': list(arrays),
+                           'created': time.time()}, f)
+            os.rename(tmp, os.path.join(self.directory, key))
+        except OSError:
+            # another process stored the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._evict()
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """
+        Returns the entries as (key, last used time, size in bytes), least recently used first.
+        """
+        entries = []
+        for key in os.listdir(self.directory):
+            path = os.path.join(self.directory, key)
+            if key.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                used = os.path.getmtime(os.path.join(path, _META))
+                size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+            except OSError:
+                continue
+            entries.append((key, used, size))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def _evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Removes all the entries.
+        """
+        for key, _, _ in self.entries():
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
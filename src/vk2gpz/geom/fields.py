@@ -0,0 +1,87 @@
+from typing import Dict, Iterator
+
+import numpy as np
+from numpy import ndarray
+
+
+class FieldStore:
+    """
+    Named per-element arrays of a manifold, each with one row per vertex (or per face).
+    A field has a fixed dtype and a shape of (N,) or (N, k).
+    """
+
+    def __init__(self, length: int):
+        """
+        :param length: The number of rows of every field.
+        """
+        self.length = length
+        self._fields: Dict[str, ndarray] = {}
+
+    def create(self, name: str, dtype=np.float64, columns: int = None, fill=0, path: str = None) -> ndarray:
+        """
+        Adds a field filled with a value.
+
+        :param name: The name of the field.
+        :param dtype: The type of the field.
+        :param columns: None for one value per element, k for k values per element.
+        :param fill: The initial value.
+        :param path: If given, the field is a np.memmap of a new .npy file at this path instead of
+               an array in memory, so it can be larger than the memory and is saved as it changes.
+        :return: The new (N,) or (N, k) array.
+        """
+        shape = (self.length,) if columns is None else (self.length, columns)
+        if path is None:
+            a = np.full(shape, fill, dtype=dtype)
+        else:
+            a = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+            a[...] = fill
+        self._fields[name] = a
+        return a
+
+    def open(self, name: str, path: str, mode: str = 'r+') -> ndarray:
+        """
+        Adds a field memory-mapped from an existing .npy file, such as one create() made.
+
+        :param name: The name of the field.
+        :param path: The .npy file.
+        :param mode: 'r+' to write through to the file, 'r' for read-only, 'c' for copy-on-write.
+        :return: The memory-mapped array.
+        """
+        self[name] = np.load(path, mmap_mode=mode)
+        return self._fields[name]
+
+    def flush(self) -> None:
+        """
+        Writes the changes of the memory-mapped fields to their files.
+        """
+        for a in self._fields.values():
+            if isinstance(a, np.memmap):
+                a.flush()
+
+    def snapshot(self) -> Dict[str, ndarray]:
+        """
+        Returns in-memory copies of all the fields, as they are now.
+        """
+        return {name: np.array(a) for name, a in self._fields.items()}
+
+    def __setitem__(self, name: str, values: ndarray) -> None:
+        values = np.asarray(values)
+        if values.ndim not in (1, 2) or len(values) != self.length:
+            raise ValueError(f'field {name} must have the shape ({self.length},) or ({self.length}, k), '
+                             f'not {values.shape}')
+        self._fields[name] = values
+
+    def __getitem__(self, name: str) -> ndarray:
+        return self._fields[name]
+
+    def __delitem__(self, name: str) -> None:
+        del self._fields[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
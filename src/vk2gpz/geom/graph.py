@@ -0,0 +1,187 @@
+import threading
+from typing import List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+
+def gather(indptr: ndarray, indices: ndarray, ids: ndarray) -> ndarray:
+    """
+    Concatenates the neighbours of the given vertices.
+
+    :param indptr: CSR row pointers of the adjacency
+    :param indices: CSR column indices of the adjacency
+    :param ids: the vertices whose neighbours are gathered
+    :return: the neighbours of ids[0], then the neighbours of ids[1], ...
+    """
+    starts = indptr[ids]
+    counts = indptr[ids + 1] - starts
+    first = np.cumsum(counts) - counts
+    return indices[np.repeat(starts - first, counts) + np.arange(int(counts.sum()))]
+
+
+def csr_from_lists(neighbours: List[List[int]]) -> Tuple[ndarray, ndarray]:
+    """
+    Builds a CSR adjacency from per-vertex neighbour lists.
+
+    :param neighbours: the neighbour indices of each vertex
+    :return: indptr and indices int32 arrays
+    """
+    indptr = np.zeros(len(neighbours) + 1, dtype=np.int32)
+    np.cumsum([len(n) for n in neighbours], out=indptr[1:])
+    indices = np.fromiter((i for n in neighbours for i in n), dtype=np.int32, count=indptr[-1])
+    return indptr, indices
+
+
+def csr_from_table(table: ndarray) -> Tuple[ndarray, ndarray]:
+    """
+    Builds a CSR adjacency from a neighbour table padded with -1.
+
+    :param table: (N, k) the neighbour indices of each vertex, -1 for none
+    :return: indptr and indices int32 arrays
+    """
+    valid = table >= 0
+    indptr = np.zeros(len(table) + 1, dtype=np.int32)
+    np.cumsum(np.count_nonzero(valid, axis=1), out=indptr[1:])
+    return indptr, table[valid].astype(np.int32)
+
+
+def csr_from_edges(v1: ndarray, v2: ndarray, n: int) -> Tuple[ndarray, ndarray]:
+    """
+    Builds the CSR adjacency of an undirected graph from its edges.  Duplicated edges and loops
+    are dropped, the neighbours of each vertex are sorted.
+
+    :param v1: the first vertices of the edges
+    :param v2: the second vertices of the edges
+    :param n: the number of vertices
+    :return: indptr and indices int32 arrays
+    """
+    v1 = v1.astype(np.int64)
+    v2 = v2.astype(np.int64)
+    keys = unique(np.concatenate([v1 * n + v2, v2 * n + v1]))
+    src = keys // n
+    dst = keys % n
+    keep = src != dst
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(src[keep], minlength=n), out=indptr[1:])
+    return indptr, dst[keep].astype(np.int32)
+
+
+class RingSearch:
+    """
+    Breadth-first k-ring search over a CSR adjacency.
+
+    The visit state of a query is kept in an epoch-stamped array owned by the calling thread,
+    instead of in the vertices.  A query never has to reset anything, so it costs time in
+    proportion to the rings it returns, and several threads can query the same mesh at once.
+    """
+
+    def __init__(self, indptr: ndarray, indices: ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self._local = threading.local()
+
+    def _next_epoch(self) -> Tuple[ndarray, int]:
+        local = self._local
+        if getattr(local, 'stamps', None) is None or local.epoch == np.iinfo(np.int32).max:
+            local.stamps = np.zeros(len(self.indptr) - 1, dtype=np.int32)
+            local.epoch = 0
+        local.epoch += 1
+        return local.stamps, local.epoch
+
+    def rings(self, seed: int, k: int) -> List[ndarray]:
+        """
+        Returns the vertices at the distance 1, 2, ..., k from the seed.
+
+        :param seed: the vertex to search from
+        :param k: the number of rings
+        :return: k arrays of vertex IDs, sorted within each ring
+        """
+        stamps, epoch = self._next_epoch()
+        stamps[seed] = epoch
+        frontier = np.array([seed], dtype=self.indices.dtype)
+        rings: List[ndarray] = []
+        for _ in range(k):
+            candidates = gather(self.indptr, self.indices, frontier)
+            frontier = unique(candidates[stamps[candidates] != epoch])
+            stamps[frontier] = epoch
+            rings.append(frontier)
+        return rings
+
+
+def k_rings(indptr: ndarray, indices: ndarray, seeds: ndarray, k: int,
+            chunk_size: int = None) -> Tuple[ndarray, ndarray, ndarray]:
+    """
+    Computes the k-ring neighbourhoods of many seed vertices at once.
+
+    All the seeds are expanded together, one ring at a time, as arrays of (seed, vertex) pairs.
+    A vertex of the next ring can only have been seen in the current or the previous ring, so
+    only those two rings are kept to filter the candidates against.
+
+    :param indptr: CSR row pointers of the adjacency
+    :param indices: CSR column indices of the adjacency
+    :param seeds: the vertices to search from
+    :param k: the number of rings
+    :param chunk_size: the number of seeds expanded together, None for all of them.
+           Use it to keep the memory bounded for many seeds.
+    :return: (ids, offsets, levels): the neighbourhood of seeds[i] is ids[offsets[i]:offsets[i + 1]],
+             ordered by the ring level given in levels, then by vertex ID
+    """
+    seeds = np.asarray(seeds, dtype=np.int64).ravel()
+    n = len(indptr) - 1
+    chunk_size = chunk_size or max(len(seeds), 1)
+    ids: List[ndarray] = []
+    levels: List[ndarray] = []
+    counts = np.zeros(len(seeds), dtype=np.int64)
+    for begin in range(0, len(seeds), chunk_size):
+        chunk = seeds[begin:begin + chunk_size]
+        previous = np.empty(0, dtype=np.int64)
+        current = np.arange(len(chunk), dtype=np.int64) * n + chunk
+        found: List[ndarray] = []
+        for level in range(1, k + 1):
+            owner = current // n
+            vertex = current % n
+            candidates = np.repeat(owner, indptr[vertex + 1] - indptr[vertex]) * n
+            candidates += gather(indptr, indices, vertex)
+            candidates = unique(candidates)
+            candidates = candidates[~_contains(current, candidates) & ~_contains(previous, candidates)]
+            previous, current = current, candidates
+            found.append(current)
+        keys = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        level = np.repeat(np.arange(1, len(found) + 1, dtype=np.int32), [len(f) for f in found])
+        order = np.lexsort((keys, level, keys // n))
+        keys = keys[order]
+        ids.append((keys % n).astype(np.int32))
+        levels.append(level[order])
+        counts[begin:begin + len(chunk)] = np.bincount(keys // n, minlength=len(chunk))
+
+    offsets = np.zeros(len(seeds) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    if not ids:
+        return np.empty(0, dtype=np.int32), offsets, np.empty(0, dtype=np.int32)
+    return np.concatenate(ids), offsets, np.concatenate(levels)
+
+
+def unique(keys: ndarray) -> ndarray:
+    """
+    np.unique() for integer keys.  It sorts the keys in place, which is several times faster
+    than the hashing np.unique() does for large arrays.
+
+    :param keys: integer keys, sorted in place
+    :return: the sorted unique keys
+    """
+    keys.sort()
+    first = np.empty(len(keys), dtype=bool)
+    first[:1] = True
+    np.not_equal(keys[1:], keys[:-1], out=first[1:])
+    return keys[first]
+
+
+def _contains(sorted_keys: ndarray, keys: ndarray) -> ndarray:
+    """
+    Tests which keys are in a sorted array.
+    """
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    position = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[position] == keys
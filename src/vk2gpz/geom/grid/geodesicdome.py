@@ -1,33 +1,87 @@
-from typing import List
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Tuple
 
 import numpy as np
-from numpy import array
+from numpy import array, ndarray
 
-from vk2gpz.geom import util
+from vk2gpz.geom import graph, util
+from vk2gpz.geom.binning import BinAccumulator
 from vk2gpz.geom.manifold import Manifold
-from vk2gpz.geom.vertex import Vertex
+from vk2gpz.geom.vertex import Vertex, VertexBuffers
+
+_logger = logging.getLogger(__name__)
 
 
 class IGeodesicDome:
     pass
 
 
+# same_vertices of a vertex that has not been looked up in its dome yet
+_NOT_DERIVED = object()
+
+
 class GeodesicVertex(Vertex):
+    __slots__ = ('_same_vertices', 'frequency', '_projected_coord', '_latlon_coord')
+
     def __init__(self, latitude=None, longitude=None, coord=None, x=None, y=None, frequency=1):
         super().__init__(x, y)
-        self.vertices: List[List[GeodesicVertex]] = [[]]
-        self.same_vertices: List[GeodesicVertex] = None
-        self.triangles: List[GeodesicVertex] = []
+        self._same_vertices: List[GeodesicVertex] = _NOT_DERIVED
         self.frequency = frequency
-        self.coord: array
-        self.projected_coord: array
-        self.latlon_coord: array
+        self._projected_coord: array = None
+        self._latlon_coord: array = None
         if (latitude is not None) and (longitude is not None):
             self.coord = util.spherical_to_xyz(latitude, longitude)
-            self.latlon_coord = np.array([latitude, longitude])
-        elif coord.any():
+            self._latlon_coord = np.array([latitude, longitude])
+        elif coord is not None:
             self.coord = coord
-            self.latlon_coord = util.xyz_to_spherical(coord)
+
+    @property
+    def same_vertices(self) -> List['GeodesicVertex']:
+        """
+        The other vertices at the same point on the sphere, None if there are none.
+        They are looked up in the seams of the dome on first use.
+        """
+        if self._same_vertices is _NOT_DERIVED:
+            if self.manifold is None:
+                return None
+            self._same_vertices = self.manifold._same_vertices_at(self.x, self.y)
+        return self._same_vertices
+
+    @same_vertices.setter
+    def same_vertices(self, same_vertices: List['GeodesicVertex']) -> None:
+        self._same_vertices = same_vertices
+
+    @property
+    def latlon_coord(self) -> array:
+        if self._latlon_coord is None:
+            if self._buffers is not None:
+                return self._buffers.latlon[self._row]
+            self._latlon_coord = util.xyz_to_spherical(self.coord)
+        return self._latlon_coord
+
+    @latlon_coord.setter
+    def latlon_coord(self, latlon_coord: array) -> None:
+        self._latlon_coord = latlon_coord
+
+    @property
+    def projected_coord(self) -> array:
+        if self._projected_coord is None and self._buffers is not None and self._buffers.projected is not None:
+            return self._buffers.projected[self._row]
+        return self._projected_coord
+
+    @projected_coord.setter
+    def projected_coord(self, projected_coord: array) -> None:
+        if self._buffers is not None and self._buffers.projected is not None:
+            self._buffers.projected[self._row] = projected_coord
+        else:
+            self._projected_coord = projected_coord
+
+    def bind(self, buffers: VertexBuffers, row: int) -> None:
+        super().bind(buffers, row)
+        self._latlon_coord = None
+        self._projected_coord = None
 
 
 def _mark_same_vertices(v: GeodesicVertex, visit_or_not: bool) -> None:
@@ -101,6 +155,397 @@ def _split_x_vertices(vertices_x: List[GeodesicVertex], frequency: int) -> List[
     return new_vertices_x
 
 
+def _ranges(starts: ndarray, stops: ndarray) -> Tuple[ndarray, ndarray]:
+    """
+    Enumerates the integer ranges [starts[i], stops[i]) one after another.
+
+    :param starts: the first value of each range
+    :param stops: the end (exclusive) of each range
+    :return: the range index and the value of every enumerated element
+    """
+    counts = np.maximum(stops - starts, 0)
+    index = np.repeat(np.arange(len(starts)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    return index, np.repeat(starts, counts) + np.arange(len(index)) - first
+
+
+def _column_starts(col_lo: ndarray, col_hi: ndarray) -> ndarray:
+    """
+    Returns where each x-column begins when the columns are laid out one after another as in
+    get_all_vertices().  The last entry is the total number of vertices.
+
+    :param col_lo: the lowest y of each x-column
+    :param col_hi: the highest y of each x-column
+    :return: the index of the first vertex of each x-column
+    """
+    starts = np.zeros(len(col_lo) + 1, dtype=np.int64)
+    np.cumsum(col_hi - col_lo + 1, out=starts[1:])
+    return starts
+
+
+def _split_columns(col_lo: ndarray, col_hi: ndarray, frequency: int) -> Tuple[ndarray, ndarray]:
+    """
+    Computes the y-range of every x-column after split(frequency).
+    A column inserted between the columns i and i + 1 starts at the bottom of column i + 1 and
+    ends at the top of column i.
+
+    :param col_lo: the lowest y of each x-column
+    :param col_hi: the highest y of each x-column
+    :param frequency: the split frequency
+    :return: the lowest and the highest y of each new x-column
+    """
+    x = np.arange((len(col_lo) - 1) * frequency + 1)
+    i = x // frequency
+    inserted = (x % frequency) != 0
+    lo = np.where(inserted, col_lo[np.minimum(i + 1, len(col_lo) - 1)], col_lo[i]) * frequency
+    hi = col_hi[i] * frequency
+    return lo, hi
+
+
+def _grid(col_lo: ndarray, col_hi: ndarray) -> Tuple[ndarray, ndarray]:
+    """
+    Returns the rectilinear (x, y) location of every vertex in get_all_vertices() order.
+    """
+    return _ranges(col_lo, col_hi + 1)
+
+
+def _triangle_slots(col_lo: ndarray, col_hi: ndarray) -> ndarray:
+    """
+    Computes the triangles of the grid in the same order as _build_faces() does.
+
+    :param col_lo: the lowest y of each x-column
+    :param col_hi: the highest y of each x-column
+    :return: (F, 3) array of vertex indices
+    """
+    starts = _column_starts(col_lo, col_hi)
+    x, y = _ranges(col_lo[1:], col_hi[:-1])
+    v1 = starts[x] + y - col_lo[x]
+    v2 = starts[x + 1] + y - col_lo[x + 1]
+    triangles = np.empty((len(x), 2, 3), dtype=np.int32)
+    triangles[:, 0, 0] = v1
+    triangles[:, 0, 1] = v2
+    triangles[:, 0, 2] = v2 + 1
+    triangles[:, 1, 0] = v1
+    triangles[:, 1, 1] = v2 + 1
+    triangles[:, 1, 2] = v1 + 1
+    return triangles.reshape(-1, 3)
+
+
+def _barycentrics(p: ndarray, a: ndarray, b: ndarray, c: ndarray) -> ndarray:
+    """
+    Computes the barycentric coordinates of the central projection of the points p onto the
+    planes of the triangles (a, b, c).
+
+    :param p: (N, 3) points
+    :param a: (N, 3) first vertices of the triangles
+    :param b: (N, 3) second vertices of the triangles
+    :param c: (N, 3) third vertices of the triangles
+    :return: (N, 3) barycentric coordinates summing to 1, NaN where the plane of the triangle does not
+             face p, so that p projects onto it from behind or not at all
+    """
+    w = np.stack([_triple(p, b, c), _triple(a, p, c), _triple(a, b, p)], axis=1)
+    total = w.sum(axis=1, keepdims=True)
+    return np.divide(w, total, out=np.full_like(w, np.nan), where=total > 0)
+
+
+def _depth(barycentrics: ndarray) -> ndarray:
+    """
+    The smallest of the barycentric coordinates along the last axis, negative outside of the triangle
+    and -inf for a triangle that does not face the point.
+    """
+    depth = barycentrics.min(axis=-1)
+    depth[np.isnan(depth)] = -np.inf
+    return depth
+
+
+def _triple(a: ndarray, b: ndarray, c: ndarray) -> ndarray:
+    """
+    Row-wise a . (b x c), without the temporaries np.cross() makes.
+    """
+    return (a[:, 0] * (b[:, 1] * c[:, 2] - b[:, 2] * c[:, 1])
+            + a[:, 1] * (b[:, 2] * c[:, 0] - b[:, 0] * c[:, 2])
+            + a[:, 2] * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0]))
+
+
+def _arc_lengths(a: ndarray, b: ndarray) -> ndarray:
+    """
+    Row-wise great-circle distance between unit vectors, from the chord so that short arcs keep their precision.
+    """
+    return 2 * np.arcsin(np.minimum(np.linalg.norm(a - b, axis=1) / 2, 1))
+
+
+def _lhuilier(a: ndarray, b: ndarray, c: ndarray) -> ndarray:
+    """
+    Spherical excess, the area on the unit sphere, of the triangles with the side lengths a, b and c,
+    by L'Huilier's theorem.
+    """
+    s = (a + b + c) / 2
+    t = np.tan(s / 2) * np.tan((s - a) / 2) * np.tan((s - b) / 2) * np.tan((s - c) / 2)
+    return 4 * np.arctan(np.sqrt(np.maximum(t, 0)))
+
+
+def _signed_areas(a: ndarray, b: ndarray, c: ndarray) -> ndarray:
+    """
+    Row-wise area of the spherical triangles (a, b, c) of unit vectors, negative for the clockwise ones,
+    by tan(E / 2) = a . (b x c) / (1 + a . b + b . c + c . a).
+    """
+    dots = np.einsum('ij,ij->i', a, b) + np.einsum('ij,ij->i', b, c) + np.einsum('ij,ij->i', c, a)
+    return 2 * np.arctan2(_triple(a, b, c), 1 + dots)
+
+
+def _partition_all(xyz: ndarray, v1: ndarray, v2: ndarray, frequency: ndarray, j: ndarray) -> ndarray:
+    """
+    Vectorised _partition(): computes the j-th of the (frequency - 1) vertices inserted between
+    v1 and v2 for every given edge.  The arithmetic is done in the same order as _partition()
+    so the coordinates come out identical.
+
+    :param xyz: (N, 3) vertex coordinates
+    :param v1: indices of the first vertices of the edges
+    :param v2: indices of the second vertices of the edges
+    :param frequency: the number of pieces each edge is divided into
+    :param j: which of the inserted vertices to compute (1 .. frequency - 1)
+    :return: (len(v1), 3) coordinates of the new vertices
+    """
+    step = (xyz[v2] - xyz[v1]) / frequency[:, np.newaxis]
+    return util.normalize(xyz[v1] + j[:, np.newaxis] * step)
+
+
+def _subdivide(col_lo: ndarray, col_hi: ndarray, xyz: ndarray, frequency: int, workers: int = None,
+               progress: Callable[[int, int], None] = None) -> Tuple[ndarray, ndarray, ndarray]:
+    """
+    Array version of GeodesicDome.split().  All new vertices are computed in two vectorised
+    passes: first the vertices on the edges of the current grid (x-columns and horizontals),
+    then the vertices on the diagonals inside each rhombus, which are partitioned between the
+    edge vertices exactly as split() does.
+
+    Both passes go through the edges and the rhombi a chunk at a time.  Every new vertex is computed
+    from the vertices of its own edge or rhombus only, so the chunks can be computed in any order,
+    and in other processes, with the same result to the bit.
+
+    :param col_lo: the lowest y of each x-column
+    :param col_hi: the highest y of each x-column
+    :param xyz: (N, 3) vertex coordinates in get_all_vertices() order
+    :param frequency: the split frequency
+    :param workers: the number of processes to compute the chunks in, None or 1 for this one
+    :param progress: called with (chunks done, chunks in total) after every chunk, or None
+    :return: the new column ranges and the new (M, 3) vertex coordinates
+    """
+    f = frequency
+    lo, hi = _split_columns(col_lo, col_hi, f)
+    starts = _column_starts(col_lo, col_hi)
+    new_starts = _column_starts(lo, hi)
+    shape = (int(new_starts[-1]), 3)
+    if workers is not None and workers > 1 and f > 1:
+        return lo, hi, _subdivide_parallel(col_lo, col_hi, xyz, f, lo, new_starts, shape, workers, progress)
+
+    new_xyz = np.empty(shape)
+    _place_vertices(col_lo, col_hi, xyz, new_xyz, lo, new_starts, f)
+    if f == 1:
+        return lo, hi, new_xyz
+    edges = _grid_edges(col_lo, col_hi, starts)
+    cells = _ranges(col_lo[1:], col_hi[:-1])
+    edge_chunks = _chunks(len(edges[0]), f - 1, 1)
+    cell_chunks = _chunks(len(cells[0]), f * f, 1)
+    total = len(edge_chunks) + len(cell_chunks)
+    for done, (begin, end) in enumerate(edge_chunks, 1):
+        _split_edges(xyz, new_xyz, lo, new_starts, f, *[a[begin:end] for a in edges])
+        if progress is not None:
+            progress(done, total)
+    for done, (begin, end) in enumerate(cell_chunks, len(edge_chunks) + 1):
+        _split_cells(new_xyz, lo, new_starts, f, *[a[begin:end] for a in cells])
+        if progress is not None:
+            progress(done, total)
+    return lo, hi, new_xyz
+
+
+# the number of new vertices computed together
+_SPLIT_CHUNK = 1 << 20
+
+
+def _chunks(n: int, per_item: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Splits n items of per_item new vertices each into ranges of about _SPLIT_CHUNK new vertices,
+    and into at least parts ranges if there are enough items.
+    """
+    size = max(1, min(_SPLIT_CHUNK // max(per_item, 1), -(-n // parts)))
+    return [(begin, min(begin + size, n)) for begin in range(0, n, size)]
+
+
+def _slots(lo: ndarray, starts: ndarray, x: ndarray, y: ndarray) -> ndarray:
+    return starts[x] + y - lo[x]
+
+
+def _place_vertices(col_lo: ndarray, col_hi: ndarray, xyz: ndarray, new_xyz: ndarray, lo: ndarray,
+                    new_starts: ndarray, f: int) -> None:
+    """
+    Copies the existing vertices to their place on the grid scaled by f.
+    """
+    x, y = _grid(col_lo, col_hi)
+    new_xyz[_slots(lo, new_starts, x * f, y * f)] = xyz
+
+
+def _grid_edges(col_lo: ndarray, col_hi: ndarray, starts: ndarray) -> Tuple[ndarray, ...]:
+    """
+    Returns the edges along the x-columns, then the horizontals between neighbouring x-columns,
+    as their two vertex indices, whether they are horizontal, and the grid location of their first vertex.
+    """
+    x1, y1 = _ranges(col_lo, col_hi)
+    x2, y2 = _ranges(col_lo[1:], col_hi[:-1] + 1)
+    v1 = np.concatenate([starts[x1] + y1 - col_lo[x1], starts[x2] + y2 - col_lo[x2]])
+    v2 = np.concatenate([v1[:len(x1)] + 1, starts[x2 + 1] + y2 - col_lo[x2 + 1]])
+    dx = np.concatenate([np.zeros(len(x1), dtype=np.int64), np.ones(len(x2), dtype=np.int64)])
+    return v1, v2, dx, np.concatenate([x1, x2]), np.concatenate([y1, y2])
+
+
+def _split_edges(xyz: ndarray, new_xyz: ndarray, lo: ndarray, new_starts: ndarray, f: int,
+                 v1: ndarray, v2: ndarray, dx: ndarray, x: ndarray, y: ndarray) -> None:
+    """
+    Computes the (f - 1) vertices inserted on each of the given edges of the current grid into new_xyz.
+    """
+    j = np.tile(np.arange(1, f), len(v1))
+    v1 = np.repeat(v1, f - 1)
+    v2 = np.repeat(v2, f - 1)
+    dx = np.repeat(dx, f - 1)
+    xs = np.repeat(x, f - 1) * f + dx * j
+    ys = np.repeat(y, f - 1) * f + (1 - dx) * j
+    new_xyz[_slots(lo, new_starts, xs, ys)] = _partition_all(xyz, v1, v2, np.full(len(j), f), j)
+
+
+def _diagonals(f: int) -> Tuple[ndarray, ...]:
+    """
+    Returns the diagonals inside a rhombus, relative to its bottom left corner, as their length h,
+    the position j of each vertex inserted on them, and the locations of their two ends.
+    upper left half: from (0, f - h) on the x-column to (h, f) on the top horizontal
+    lower right half: from (f - h, 0) on the bottom horizontal to (f, h) on the next x-column
+    """
+    h, j = _ranges(np.full(f + 1, 1), np.arange(f + 1))
+    upper = h >= 2
+    lower = upper & (h < f)
+    h = np.concatenate([h[upper], h[lower]])
+    j = np.concatenate([j[upper], j[lower]])
+    n_upper = np.count_nonzero(upper)
+    b_x = np.concatenate([np.zeros(n_upper, dtype=np.int64), f - h[n_upper:]])
+    b_y = np.concatenate([f - h[:n_upper], np.zeros(len(h) - n_upper, dtype=np.int64)])
+    t_x = np.concatenate([h[:n_upper], np.full(len(h) - n_upper, f)])
+    t_y = np.concatenate([np.full(n_upper, f), h[n_upper:]])
+    return h, j, b_x, b_y, t_x, t_y
+
+
+def _split_cells(new_xyz: ndarray, lo: ndarray, new_starts: ndarray, f: int, cx: ndarray, cy: ndarray) -> None:
+    """
+    Computes the vertices on the diagonals inside the given rhombi into new_xyz, between the vertices
+    _split_edges() put on their edges.
+    """
+    h, j, b_x, b_y, t_x, t_y = _diagonals(f)
+    cx = cx[:, np.newaxis] * f
+    cy = cy[:, np.newaxis] * f
+    v1 = _slots(lo, new_starts, cx + b_x, cy + b_y).ravel()
+    v2 = _slots(lo, new_starts, cx + t_x, cy + t_y).ravel()
+    v = _slots(lo, new_starts, cx + b_x + j, cy + b_y + j).ravel()
+    h = np.tile(h, len(cx))
+    j = np.tile(j, len(cx))
+    new_xyz[v] = _partition_all(new_xyz, v1, v2, h, j)
+
+
+def _subdivide_parallel(col_lo: ndarray, col_hi: ndarray, xyz: ndarray, f: int, lo: ndarray, new_starts: ndarray,
+                        shape: Tuple[int, int], workers: int, progress: Callable[[int, int], None]) -> ndarray:
+    """
+    _subdivide() with the chunks computed in a pool of processes, which read the current coordinates from
+    and write the new ones into shared memory.  All the edges are done before any of the rhombi.
+    """
+    old = shared_memory.SharedMemory(create=True, size=max(xyz.nbytes, 1))
+    new = shared_memory.SharedMemory(create=True, size=max(shape[0] * 3 * 8, 1))
+    try:
+        old_xyz = np.ndarray(xyz.shape, dtype=np.float64, buffer=old.buf)
+        old_xyz[...] = xyz
+        new_xyz = np.ndarray(shape, dtype=np.float64, buffer=new.buf)
+        _place_vertices(col_lo, col_hi, old_xyz, new_xyz, lo, new_starts, f)
+
+        names = (old.name, xyz.shape, new.name, shape)
+        edges = _grid_edges(col_lo, col_hi, _column_starts(col_lo, col_hi))
+        cells = _ranges(col_lo[1:], col_hi[:-1])
+        edge_tasks = [(names, lo, new_starts, f, 'edges', [a[b:e] for a in edges])
+                      for b, e in _chunks(len(edges[0]), f - 1, workers)]
+        cell_tasks = [(names, lo, new_starts, f, 'cells', [a[b:e] for a in cells])
+                      for b, e in _chunks(len(cells[0]), f * f, workers)]
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # the rhombi are only started once the results of all the edges are in
+            for tasks in (edge_tasks, cell_tasks):
+                for _ in pool.map(_split_task, tasks):
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(edge_tasks) + len(cell_tasks))
+        result = np.array(new_xyz)
+        del old_xyz, new_xyz
+    finally:
+        for memory in (old, new):
+            memory.close()
+            memory.unlink()
+    return result
+
+
+def _split_task(task) -> None:
+    """
+    Computes one chunk of _subdivide_parallel() in a worker process.
+    """
+    (old_name, old_shape, new_name, new_shape), lo, new_starts, f, stage, arrays = task
+    # the workers share the resource tracker of the process that created the memory, which unlinks it
+    old = shared_memory.SharedMemory(name=old_name)
+    new = shared_memory.SharedMemory(name=new_name)
+    try:
+        xyz = np.ndarray(old_shape, dtype=np.float64, buffer=old.buf)
+        new_xyz = np.ndarray(new_shape, dtype=np.float64, buffer=new.buf)
+        if stage == 'edges':
+            _split_edges(xyz, new_xyz, lo, new_starts, f, *arrays)
+        else:
+            _split_cells(new_xyz, lo, new_starts, f, *arrays)
+        del xyz, new_xyz
+    finally:
+        old.close()
+        new.close()
+
+
+# the rectilinear locations of the icosahedron vertices that share a point on the sphere.
+# same_vertices lists the other vertices of a pole in this order.
+_TOP_POLE = ((0, 1), (1, 2), (2, 3), (3, 4), (4, 5))  # v2, v5, v9, v13, v17
+_BOTTOM_POLE = ((2, 0), (3, 1), (4, 2), (5, 3), (6, 4))  # v6, v10, v14, v18, v21
+_SAME_PAIRS = (((0, 0), (5, 5)), ((1, 0), (6, 5)))  # (v1, v20), (v3, v22)
+
+
+def _seams(frequency: int) -> Tuple[ndarray, ndarray]:
+    """
+    Computes where the same points on the sphere appear more than once on the rectilinear grid,
+    the correspondences canonical_ids and same_vertices are built from.
+
+    :param frequency: The frequency of the Geodesicdome.
+    :return: (P, 4) array of the (x, y) locations of P vertex pairs,
+             and (2, 5, 2) array of the (x, y) locations of the two poles
+    """
+    f = frequency
+    a = np.arange(1, f)
+    pairs: List[ndarray] = []
+
+    def pair(x1, y1, x2, y2):
+        pairs.append(np.stack(np.broadcast_arrays(*np.atleast_1d(x1, y1, x2, y2)), axis=1))
+
+    for (x1, y1), (x2, y2) in _SAME_PAIRS:
+        pair(x1 * f, y1 * f, x2 * f, y2 * f)
+    # stage 1, between the top poles
+    for p in range(len(_TOP_POLE) - 1):
+        pair(p * f + a, (p + 1) * f, (p + 1) * f, (p + 2) * f - a)
+    # stage 2, the flat top and the last x-column
+    pair(4 * f + a, 5 * f, 0, f - a)
+    pair(5 * f + a, 5 * f, a, 0)
+    pair(6 * f, 4 * f + a, 2 * f - a, 0)
+    # stage 3, between the bottom poles
+    for q in range(1, len(_BOTTOM_POLE)):
+        pair((q + 2) * f - a, q * f, (q + 1) * f, (q - 1) * f + a)
+
+    poles = np.array([_TOP_POLE, _BOTTOM_POLE]) * f
+    return np.concatenate(pairs), poles
+
+
 class GeodesicDome(IGeodesicDome, Manifold):
     """
     A Geodesicdome based on the Icosahedron (22 vertices and 20 triangles)
@@ -123,9 +568,21 @@ class GeodesicDome(IGeodesicDome, Manifold):
     def __init__(self, frequency=1):
         super().__init__()
         self.arcLength = GeodesicDome._arc_length  # approximate the average arc length
-        self.frequency = frequency
+        self.frequency = 1  # split() below brings it up to the requested frequency
         self.x_max = 6
         self.y_max = 5
+        self._col_lo: ndarray = None
+        self._col_hi: ndarray = None
+        self._col_start: ndarray = None
+        self._canonical_ids: ndarray = None
+        self._first_slots: ndarray = None
+        self._seam_slots: Tuple[ndarray, ndarray] = None
+        self._same_slots: Dict[int, List[int]] = None
+        self._locator: Tuple[ndarray, ...] = None
+        self._vertex_faces: ndarray = None
+        self._geometry: Dict[str, ndarray] = {}
+        self._all_vertices: List[GeodesicVertex] = None
+        self.triangles: List[GeodesicVertex] = None
         self.vertices: List[List[GeodesicVertex]] = [[]] * (self.x_max + 1)
 
         # initialize the icosahedron, calculate all the vertex coordinates
@@ -176,157 +633,563 @@ class GeodesicDome(IGeodesicDome, Manifold):
         vList7 = [v21, v22]
         self.vertices[6] = vList7
 
-        # initialize same vertices list for vertices
-        # v1
-        v1.same_vertices = [v20]
+        # the same vertices are looked up in the seams of the dome
+        self._link_vertices()
 
-        # v2
-        v2.same_vertices = [v5, v9, v13, v17]
+        if frequency > 1:
+            self.split(frequency)
 
-        # v3
-        v3.same_vertices = [v22]
+    @classmethod
+    def from_frequency(cls, frequency: int, backend: str = "array", workers: int = None) -> 'GeodesicDome':
+        """
+        Builds a Geodesicdome of the given frequency.
+
+        :param frequency: The frequency of the Geodesicdome.
+        :param backend: "array" computes all the vertex coordinates in bulk with NumPy and creates
+               the GeodesicVertex objects only when they are asked for.
+               "object" builds the dome vertex by vertex, the same as GeodesicDome(frequency).
+        :param workers: The number of processes the "array" backend splits the dome in, None for this one.
+        :return: The Geodesicdome.
+        """
+        if backend == "object":
+            return cls(frequency)
+        if backend != "array":
+            raise ValueError(f'unknown backend: {backend}')
+
+        dome = cls()
+        dome._layout()
+        dome.get_all_xyz()
+        dome._vertices = None
+        if frequency > 1:
+            dome.split(frequency, workers)
+        return dome
+
+    @property
+    def vertices(self) -> List[List[GeodesicVertex]]:
+        if self._vertices is None:
+            self._materialize_vertices()
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices: List[List[GeodesicVertex]]) -> None:
+        self._vertices = vertices
+        self._buffers = None
+        self._col_lo = None
+        self._col_hi = None
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        super()._invalidate()
+        self._all_vertices = None
+        self.triangles = None
+        self._col_start = None
+        self._canonical_ids = None
+        self._first_slots = None
+        self._seam_slots = None
+        self._same_slots = None
+        self._locator = None
+        self._vertex_faces = None
+        self._geometry = {}
+
+    @property
+    def xyz(self) -> ndarray:
+        """
+        (N, 3) coordinates of all the vertices in get_all_vertices() order, the same buffer as get_all_xyz().
+        """
+        return self.get_all_xyz()
 
-        # v5
-        v5.same_vertices = [v2, v9, v13, v17]
+    @property
+    def grid_xy(self) -> ndarray:
+        """
+        (N, 2) rectilinear (x, y) locations of all the vertices in get_all_vertices() order.
+        """
+        col_lo, col_hi = self._layout()
+        return np.stack(_grid(col_lo, col_hi), axis=1).astype(np.int32)
 
-        # v6
-        v6.same_vertices = [v10, v14, v18, v21]
+    @property
+    def faces(self) -> ndarray:
+        """
+        (F, 3) vertex indices of all the triangles in get_faces() order, the same as face_indices().
+        """
+        return self.face_indices()
 
-        # v9
-        v9.same_vertices = [v2, v5, v13, v17]
+    @property
+    def canonical_ids(self) -> ndarray:
+        """
+        (N,) canonical vertex ID of every vertex in get_all_vertices() order.
+        Vertices registered as same vertices share one canonical ID.  The IDs are numbered in
+        the order their first vertex appears in get_all_vertices().
+        """
+        if self._canonical_ids is None:
+            pairs, poles = self._find_same_vertices()
+            first = np.arange(self.get_number_of_vertices())
+            a, b = pairs[:, 0], pairs[:, 1]
+            first[a] = np.minimum(a, b)
+            first[b] = np.minimum(a, b)
+            for slots in poles:
+                first[slots] = slots.min()
+            is_first = first == np.arange(len(first))
+            self._canonical_ids = (np.cumsum(is_first) - 1)[first].astype(np.int32)
+            self._first_slots = np.flatnonzero(is_first)
+        return self._canonical_ids
+
+    @property
+    def welded_xyz(self) -> ndarray:
+        """
+        (10 * frequency^2 + 2, 3) coordinates of the canonical vertices, one row per point on the sphere.
+        """
+        self.canonical_ids
+        return self.xyz[self._first_slots]
 
-        # v10
-        v10.same_vertices = [v6, v14, v18, v21]
+    @property
+    def welded_faces(self) -> ndarray:
+        """
+        (F, 3) canonical vertex IDs of all the triangles in get_faces() order.
+        """
+        return self.canonical_ids[self.faces]
 
-        # v13
-        v13.same_vertices = [v2, v5, v9, v17]
+    def _cached_geometry(self, name: str) -> ndarray:
+        """
+        Returns one of the geometry arrays, computing them all on first use.
+        """
+        if not self._geometry:
+            xyz = util.normalize(self.welded_xyz)
+            faces = self.welded_faces
+            a, b, c = xyz[faces[:, 0]], xyz[faces[:, 1]], xyz[faces[:, 2]]
+            sides = [_arc_lengths(b, c), _arc_lengths(c, a), _arc_lengths(a, b)]
+            face_areas = _lhuilier(*sides)
+
+            # the dual cell of a vertex takes from each of its triangles the part closer to it than to the
+            # other corners, bounded by the great circles from the circumcentre to the edge midpoints.  The
+            # two corners of an edge get mirror images of each other, so one area per edge is enough.
+            face_normals = np.cross(b - a, c - a)
+            circumcentres = util.normalize(face_normals)
+            halves = [_signed_areas(p, util.normalize(p + q), circumcentres) for p, q in [(a, b), (b, c), (c, a)]]
+            parts = np.stack([halves[2] + halves[0], halves[0] + halves[1], halves[1] + halves[2]], axis=1)
+            # the parts add up to the triangle, up to rounding, share it out exactly
+            parts *= (face_areas / parts.sum(axis=1))[:, np.newaxis]
+            vertex_areas = np.bincount(faces.ravel(), parts.ravel(), len(xyz))
+
+            indptr, indices = self.adjacency()
+            rows = np.repeat(np.arange(len(xyz), dtype=np.int32), np.diff(indptr))
+            edges = np.stack([rows, indices], axis=1)[rows < indices]
+
+            # the area-weighted mean of the normals of the triangles around each vertex
+            vertex_normals = np.stack([np.bincount(faces.ravel(), np.repeat(face_normals[:, k], 3), len(xyz))
+                                       for k in range(3)], axis=1)
+
+            geometry = dict(face_areas=face_areas, vertex_areas=vertex_areas, edges=edges,
+                            edge_lengths=_arc_lengths(xyz[edges[:, 0]], xyz[edges[:, 1]]),
+                            vertex_normals=util.normalize(vertex_normals))
+            for array in geometry.values():
+                array.flags.writeable = False
+            self._geometry = geometry
+        return self._geometry[name]
+
+    @property
+    def face_areas(self) -> ndarray:
+        """
+        (F,) area of every triangle in get_faces() order on the unit sphere, summing to 4 pi.
+        The geometry arrays are computed once from the coordinates and dropped by split().
+        """
+        return self._cached_geometry('face_areas')
 
-        # v14
-        v14.same_vertices = [v6, v10, v18, v21]
+    @property
+    def vertex_areas(self) -> ndarray:
+        """
+        (10 * frequency^2 + 2,) area of the dual (Voronoi) cell of every canonical vertex on the unit sphere,
+        the part of the sphere closer to it than to its neighbours.  The cells tile the sphere, the areas sum to 4 pi.
+        """
+        return self._cached_geometry('vertex_areas')
 
-        # v17
-        v17.same_vertices = [v2, v5, v9, v13]
+    @property
+    def edges(self) -> ndarray:
+        """
+        (E, 2) int32 canonical vertex IDs of every edge, the lower ID first, sorted.
+        """
+        return self._cached_geometry('edges')
 
-        # v18
-        v18.same_vertices = [v6, v10, v14, v21]
+    @property
+    def edge_lengths(self) -> ndarray:
+        """
+        (E,) great-circle length of every edge in edges order on the unit sphere.
+        """
+        return self._cached_geometry('edge_lengths')
 
-        # v20
-        v20.same_vertices = [v1]
+    @property
+    def vertex_normals(self) -> ndarray:
+        """
+        (10 * frequency^2 + 2, 3) outward unit normal of the mesh at every canonical vertex, the area-weighted
+        mean of the normals of its triangles.
+        """
+        return self._cached_geometry('vertex_normals')
 
-        # v21
-        v21.same_vertices = [v6, v10, v14, v18]
+    def locate(self, points: ndarray, chunk_size: int = 1 << 16) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Finds the triangles the points fall in, looking them up from the icosahedral structure
+        instead of searching the vertices.
+
+        The base face of a point is found by testing it against the edges of the 20 icosahedron
+        faces in one matrix product.  The central (gnomonic) projection onto the plane of that face
+        maps the great circles the triangle edges lie on to straight lines.  For a dome split once
+        from the icosahedron it also maps the vertices to a regular lattice, so the barycentric
+        coordinates in the base face give the rectilinear (x, y) cell directly.  A dome split more
+        than once, from vertices already moved onto the sphere, is only close to that lattice, so the
+        points that fall outside of the cell found are walked to the triangle they are in.
+
+        :param points: (N, 3) coordinates, not necessarily normalized, or (N, 2) latitudes and
+               longitudes in radian as util.xyz_to_latlong() gives them.
+        :param chunk_size: The number of points processed at once, it bounds the temporary memory.
+        :return: (vertex_id, triangle_id, barycentrics): the canonical ID of the vertex closest to
+                 each point, the row of the triangle it is in in face_indices(), and the (N, 3)
+                 barycentric coordinates of the point in that triangle, summing to 1.  A point that
+                 is not finite or is the zero vector has no direction: its IDs are -1 and its
+                 barycentric coordinates NaN.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        n = len(points)
+        vertex_id = np.empty(n, dtype=np.int32)
+        triangle_id = np.empty(n, dtype=np.int32)
+        barycentrics = np.empty((n, 3))
+        welded_xyz = self.welded_xyz
+        for begin in range(0, n, chunk_size):
+            chunk = points[begin:begin + chunk_size]
+            end = begin + len(chunk)
+            valid = np.isfinite(chunk).all(axis=1)
+            if chunk.shape[1] == 2:
+                chunk = util.latlong_to_xyz(chunk[valid])
+            else:
+                scale = np.abs(chunk[valid]).max(axis=1)
+                valid[valid] = scale > 0
+                chunk = chunk[valid]
+                # the direction is all that counts, tiny vectors are scaled up before the products underflow
+                tiny = np.abs(chunk).max(axis=1) < 1e-100
+                chunk[tiny] /= np.abs(chunk[tiny]).max(axis=1, keepdims=True)
+            rows = np.arange(begin, end)[valid]
+            vertex_id[begin:end] = -1
+            triangle_id[begin:end] = -1
+            barycentrics[begin:end] = np.nan
+            triangle_id[rows], barycentrics[rows] = self._locate(chunk)
+            vertex_id[rows] = self._nearest_vertices(chunk, self.canonical_ids[self.faces[triangle_id[rows]]], welded_xyz)
+        return vertex_id, triangle_id, barycentrics
+
+    def _nearest_vertices(self, xyz: ndarray, corners: ndarray, welded_xyz: ndarray) -> ndarray:
+        """
+        Returns the canonical vertex closest to each of the (N, 3) points, starting from the corner of its
+        triangle that is the closest and moving on to closer neighbours while there are any.  The dome is
+        a Delaunay triangulation, so the vertex no neighbour is closer than is the closest of all.
+        """
+        rows = np.arange(len(xyz))
+        dots = np.einsum('ij,ikj->ik', xyz, welded_xyz[corners])
+        closest = np.argmax(dots, axis=1)
+        nearest = corners[rows, closest]
+        best = dots[rows, closest]
+        table = self.neighbour_table()
+        moving = rows
+        while len(moving):
+            neighbours = table[nearest[moving]]
+            neighbours = np.where(neighbours < 0, nearest[moving, np.newaxis], neighbours)
+            dots = np.einsum('ij,ikj->ik', xyz[moving], welded_xyz[neighbours])
+            closest = np.argmax(dots, axis=1)
+            closer = dots[np.arange(len(moving)), closest] > best[moving]
+            moving = moving[closer]
+            nearest[moving] = neighbours[closer, closest[closer]]
+            best[moving] = dots[closer, closest[closer]]
+        return nearest
+
+    def _locate(self, xyz: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        locate() for a chunk of (N, 3) points.
+        """
+        if self._locator is None:
+            col_lo, col_hi = self._layout()
+            f = self.frequency
+            # the icosahedron faces are the triangles of the grid at frequency 1
+            base_lo = col_lo[::f] // f
+            base_hi = col_hi[::f] // f
+            base_x, base_y = _grid(base_lo, base_hi)
+            base_faces = _triangle_slots(base_lo, base_hi)
+            grid = np.stack([base_x, base_y], axis=1)[base_faces] * f
+            a, b, c = np.moveaxis(self.xyz[self._slot(grid[:, :, 0], grid[:, :, 1])], 1, 0)
+            # p . (b x c), p . (c x a) and p . (a x b) are the barycentric coordinates of p in the
+            # face (a, b, c), up to a common factor.  Scaled to unit normals, they are the sines of
+            # the distances from p to the great circles of the edges.
+            normals = np.stack([np.cross(b, c), np.cross(c, a), np.cross(a, b)], axis=1)
+            normals *= np.sign(np.einsum('ij,ij->i', a, normals[:, 0]))[:, np.newaxis, np.newaxis]
+            lengths = np.linalg.norm(normals, axis=2)
+            # (edge, xyz, face), so that each edge is tested against all the faces in one product
+            unit_normals = np.ascontiguousarray((normals / lengths[:, :, np.newaxis]).transpose(1, 2, 0))
+            cells = np.maximum(col_hi[:-1] - col_lo[1:], 0)
+            cell_start = np.cumsum(cells) - cells
+            self._locator = (unit_normals, lengths, grid.astype(np.float64), cell_start)
+        unit_normals, lengths, grid, cell_start = self._locator
+        col_lo = self._layout()[0]
+
+        # the base face is the one the point is the deepest inside of: the only one it is inside of,
+        # or the closest one for points on the edges
+        distances = [xyz @ edge for edge in unit_normals]
+        base = np.argmax(np.minimum(np.minimum(distances[0], distances[1]), distances[2]), axis=1)
+        rows = np.arange(len(xyz))
+        w = np.stack([d[rows, base] for d in distances], axis=1) * lengths[base]
+        g = np.einsum('ij,ijk->ik', w, grid[base]) / w.sum(axis=1, keepdims=True)
+        # rounding can put points on the edges of the base face just outside of it
+        lowest = grid[base].min(axis=1)
+        cell = np.clip(np.floor(g), lowest, lowest + self.frequency - 1).astype(np.int64)
+        fraction = g - cell
+        x = cell[:, 0]
+        second = fraction[:, 1] > fraction[:, 0]
+        triangle = (2 * (cell_start[x] + cell[:, 1] - col_lo[x + 1]) + second).astype(np.int32)
+
+        corners = self.xyz[self.faces[triangle]]
+        barycentrics = _barycentrics(xyz, corners[:, 0], corners[:, 1], corners[:, 2])
+        return self._walk(xyz, triangle, barycentrics)
+
+    def _walk(self, xyz: ndarray, triangle: ndarray, barycentrics: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        Moves the points with a negative barycentric coordinate to the triangle around the corners of their
+        triangle they are the deepest inside of, until they are inside of one or no triangle is better.
+        """
+        if self._vertex_faces is None:
+            # the triangles around every canonical vertex, padded with -1 around the pentagons
+            faces = self.welded_faces.ravel()
+            order = np.argsort(faces, kind='stable')
+            counts = np.bincount(faces, minlength=len(self._first_slots))
+            column = np.arange(len(faces)) - np.repeat(np.cumsum(counts) - counts, counts)
+            vertex_faces = np.full((len(counts), counts.max()), -1, dtype=np.int32)
+            vertex_faces[faces[order], column] = order // 3
+            self._vertex_faces = vertex_faces
+        # a triangle that does not face the point is never inside of it
+        depth = _depth(barycentrics)
+        outside = np.flatnonzero(depth < 0)
+        while len(outside):
+            candidates = self._vertex_faces[self.canonical_ids[self.faces[triangle[outside]]]].reshape(len(outside), -1)
+            candidates = np.where(candidates < 0, triangle[outside, np.newaxis], candidates)
+            k = candidates.shape[1]
+            corners = self.xyz[self.faces[candidates.ravel()]]
+            w = _barycentrics(np.repeat(xyz[outside], k, axis=0), corners[:, 0], corners[:, 1], corners[:, 2])
+            w = w.reshape(len(outside), k, 3)
+            depths = _depth(w)
+            deepest = np.argmax(depths, axis=1)
+            rows = np.arange(len(outside))
+            better = depths[rows, deepest] > depth[outside]
+            moved = outside[better]
+            triangle[moved] = candidates[better, deepest[better]]
+            barycentrics[moved] = w[better, deepest[better]]
+            depth[moved] = depths[rows[better], deepest[better]]
+            outside = moved[depth[moved] < 0]
+        return triangle, barycentrics
+
+    def bin(self, points, values: ndarray = None, reducer: str = 'sum', on: str = 'vertex', name: str = None,
+            chunk_size: int = 1 << 16) -> ndarray:
+        """
+        Reduces values observed at points on the sphere onto the vertices or the faces they fall in.
+
+        :param points: (N, 3) coordinates or (N, 2) latitudes and longitudes, as locate() takes them.
+               It can also be an iterable of chunks, each a (points, values) pair, or just the points
+               when values are not needed, so that the whole input never has to be in memory.
+        :param values: (N,) or (N, k) values at the points, None with chunked points or for 'count'.
+        :param reducer: 'sum', 'mean', 'count' or 'max'.
+        :param on: 'vertex' to reduce onto the canonical vertex closest to each point,
+               'face' onto the triangle each point falls in.
+        :param name: If given, the result is also stored under this name in fields (for the
+               vertices, one row per vertex with the same value for the same vertices) or face_fields.
+        :param chunk_size: The number of points located at once, when points is an array.
+        :return: (n,) or (n, k) array, n the number of canonical vertices or of faces.
+                 Empty bins are 0 for 'sum' and 'count', NaN for 'mean' and 'max'.
+                 The points locate() finds no direction for (zero vectors, NaN or inf) are left out,
+                 and their number is logged as a warning.
+        """
+        if on not in ('vertex', 'face'):
+            raise ValueError(f'unknown bin target: {on}')
+        n_bins = len(self.welded_xyz) if on == 'vertex' else len(self.faces)
+        accumulator = BinAccumulator(n_bins, reducer)
+
+        if isinstance(points, ndarray):
+            chunks = ((points[i:i + chunk_size], None if values is None else values[i:i + chunk_size])
+                      for i in range(0, len(points), chunk_size))
+        else:
+            chunks = (chunk if isinstance(chunk, tuple) else (chunk, None) for chunk in points)
+        skipped = 0
+        for chunk_points, chunk_values in chunks:
+            vertex_id, triangle_id, _ = self.locate(chunk_points, chunk_size)
+            ids = vertex_id if on == 'vertex' else triangle_id
+            valid = ids >= 0
+            if not valid.all():
+                skipped += len(ids) - int(np.count_nonzero(valid))
+                ids = ids[valid]
+                if chunk_values is not None:
+                    chunk_values = np.asarray(chunk_values)[valid]
+            accumulator.add(ids, chunk_values)
+        if skipped:
+            _logger.warning('%d points without a direction were not binned', skipped)
+
+        result = accumulator.result()
+        if name is not None:
+            if on == 'vertex':
+                self.fields[name] = result[self.canonical_ids]
+            else:
+                self.face_fields[name] = result
+        return result
+
+    def get_vertex_id(self, v: GeodesicVertex) -> int:
+        """
+        Returns the canonical vertex ID of a vertex.
 
-        # v22
-        v22.same_vertices = [v3]
+        :param v: The vertex.
+        :return: The canonical vertex ID.
+        """
+        return int(self.canonical_ids[self._slot(v.x, v.y)])
 
-        if frequency > 1:
-            self.split(frequency)
+    def get_vertex_by_id(self, i: int) -> GeodesicVertex:
+        """
+        Returns the first of the vertices sharing a canonical vertex ID.
 
-    def _find_same_vertices(self):
-        """
-            used after split, find the same vertices for the new generated vertices
-                               *
-                             / |
-                            / /*
-                           / / |
-                   ^     *--*--*
-                   |     |
-                   |     *
-                         |
-        """
-        first_x: List[GeodesicVertex] = self.vertices[0]
-        top_current: GeodesicVertex = first_x[len(first_x) - 1]
-        top_next: GeodesicVertex = None
-        # stage1, travel through the top vertices that has 4 same vertices points
-        # through v2, v5, v9, v13 and v17
-        i = 0
-        while i < len(top_current.same_vertices):
-            top_next = top_current.same_vertices[i]
-            x1 = top_current.x
-            y1 = top_current.y
-            x2 = top_next.x
-            y2 = top_next.y
-            top_middle: GeodesicVertex = self.get_vertex_at(x1 + 1, y1)
-            while (x1 + 1) != x2:
-                if top_middle.same_vertices is not None and top_middle.same_vertices:
-                    x1 += 1
-                    y2 -= 1
-                    top_middle = self.get_vertex_at(x1 + 1, y1)
-                    continue
-
-                top_middle_match = self.get_vertex_at(x2, y2 - 1)
-                top_middle.same_vertices = [top_middle_match]
-                top_middle_match.same_vertices = [top_middle]
-
-                x1 += 1
-                y2 -= 1
-                top_middle = self.get_vertex_at(x1 + 1, y1)
-
-            top_current = top_next
-            i += 1
-        print(f'Stage1 finished: i = {i}')
-
-        # stage 2, travel through the flat top vertex
-        # through v20, v21
-        v17_x = top_next.x  # v17
-        v17_y = top_next.y
-        v2 = self.vertices[0][len(self.vertices[0]) - 1]
-        for i in range(v17_x + 1, self.x_max):
-            vHigh = self.get_vertex_at(i, v17_y)
-            if vHigh.same_vertices is not None and vHigh.same_vertices:
-                continue
-
-            xdiff = vHigh.x - v17_x
-            vLow = self.get_vertex_at(0, v2.y - xdiff) if (xdiff < v2.y) else self.get_vertex_at(xdiff - v2.y, 0)
-
-            vHigh.same_vertices = [vLow]
-            vLow.same_vertices = [vHigh]
-
-        # through v21 to v22
-        last_x = self.vertices[self.x_max]
-        v22 = last_x[len(last_x) - 1]
-        v3 = v22.same_vertices[0]
-        for i in range(len(last_x) - 1 - 1, 0, -1):
-            test = last_x[i]
-            if test.same_vertices is not None and test.same_vertices:
-                continue
-            match = self.get_vertex_at(v3.x + (v22.y - test.y), 0)
-            match.same_vertices = [test]
-            test.same_vertices = [match]
-
-        # stage 3, travel through the boottom vertice that has 4 same vertices
-        # through v21, v18, v14, v10, v6
-        v21 = last_x[0]
-        v1 = v21
-        i = len(v1.same_vertices) - 1
-        while i > 0:
-            v2 = v1.same_vertices[i]  # v18
-            x1 = v1.x
-            y1 = v1.y
-            x2 = v2.x
-            y2 = v2.y
-            v3: GeodesicVertex = self.get_vertex_at(x1 - 1, y1)
-            while (x1 - 1) != x2:
-                # print(f'x1, x2, y1, y2, v2, v3 = {x1, x2, y1, y2, v2, v3}')
-                if v3.same_vertices is not None and v3.same_vertices:
-                    x1 -= 1
-                    y2 += 1
-                    v3 = self.get_vertex_at(x1 - 1, y1)
-                    continue
-
-                v4 = self.get_vertex_at(x2, y2 + 1)
-                v3.same_vertices = [v4]
-                v4.same_vertices = [v3]
-
-                x1 -= 1
-                y2 += 1
-                v3 = self.get_vertex_at(x1 - 1, y1)
-
-            v1 = v2
-            i -= 1
+        :param i: The canonical vertex ID.
+        :return: The vertex.
+        """
+        self.canonical_ids
+        slot = self._first_slots[i]
+        starts = self._starts()
+        x = int(np.searchsorted(starts, slot, side='right')) - 1
+        return self.vertices[x][slot - starts[x]]
+
+    def adjacency(self) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the neighbours of all the canonical vertices in CSR form, the neighbours of the
+        vertex i are indices[indptr[i]:indptr[i + 1]].  It is built once from the faces, with the
+        same vertices already merged, and must not be modified.
+
+        :return: indptr and indices int32 arrays
+        """
+        if self._adjacency is None:
+            faces = self.welded_faces
+            indptr, indices = graph.csr_from_edges(faces.ravel(), faces[:, [1, 2, 0]].ravel(), len(self._first_slots))
+            indptr.flags.writeable = False
+            indices.flags.writeable = False
+            self._adjacency = (indptr, indices)
+        return self._adjacency
+
+    def _cache_arrays(self) -> Dict[str, ndarray]:
+        arrays = super()._cache_arrays()
+        col_lo, col_hi = self._layout()
+        arrays.update(col_lo=col_lo, col_hi=col_hi, canonical_ids=self.canonical_ids, first_slots=self._first_slots)
+        return arrays
+
+    def _restore_cache_arrays(self, arrays: Dict[str, ndarray]) -> None:
+        frequency = (len(arrays['col_lo']) - 1) // 6
+        self._vertices = None
+        self.frequency = frequency
+        self.x_max = 6 * frequency
+        self.y_max = 5 * frequency
+        self.arcLength = GeodesicDome._arc_length / frequency
+        self._col_lo = arrays['col_lo']
+        self._col_hi = arrays['col_hi']
+        self._buffers = VertexBuffers(arrays['xyz'])
+        self._invalidate()
+        super()._restore_cache_arrays(arrays)
+        self._canonical_ids = arrays['canonical_ids']
+        self._first_slots = arrays['first_slots']
+
+    def _layout(self) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the lowest and the highest y of each x-column.
+        """
+        if self._col_lo is None:
+            self._col_lo = np.array([x_list[0].y for x_list in self._vertices])
+            self._col_hi = np.array([x_list[-1].y for x_list in self._vertices])
+        return self._col_lo, self._col_hi
+
+    def _starts(self) -> ndarray:
+        """
+        Returns the index in get_all_vertices() of the first vertex of each x-column.
+        """
+        if self._col_start is None:
+            self._col_start = _column_starts(*self._layout())
+        return self._col_start
+
+    def _slot(self, x, y):
+        """
+        Returns the index in get_all_vertices() of the vertex at (x, y).
+        """
+        return self._starts()[x] + y - self._layout()[0][x]
+
+    def _materialize_vertices(self) -> None:
+        """
+        Creates the GeodesicVertex objects of an array-backed dome and registers their same vertices.
+        """
+        col_lo, col_hi = self._layout()
+        starts = _column_starts(col_lo, col_hi)
+        self._vertices = []
+        for x in range(len(col_lo)):
+            x_list: List[GeodesicVertex] = []
+            for i in range(starts[x], starts[x + 1]):
+                y = int(col_lo[x] + i - starts[x])
+                v = GeodesicVertex(x=x, y=y, frequency=self.frequency)
+                v.manifold = self
+                v.bind(self._buffers, i)
+                x_list.append(v)
+            self._vertices.append(x_list)
+
+    def _link_vertices(self) -> None:
+        """
+        Points all the vertices at this dome, so that they look their same vertices up in it again.
+        """
+        for x_list in self._vertices:
+            for v in x_list:
+                v.manifold = self
+                v.same_vertices = _NOT_DERIVED
+
+    def _find_same_vertices(self) -> Tuple[ndarray, ndarray]:
+        """
+        Finds where the same points on the sphere appear more than once on the grid, from the frequency alone.
+
+        :return: (P, 2) int32 array of the indices in get_all_vertices() of P pairs of same vertices,
+                 and (2, 5) int32 array of the indices of the vertices of the top and the bottom pole
+        """
+        if self._seam_slots is None:
+            pairs, poles = _seams(self.frequency)
+            pairs = np.stack([self._slot(pairs[:, 0], pairs[:, 1]), self._slot(pairs[:, 2], pairs[:, 3])], axis=1)
+            poles = self._slot(poles[..., 0], poles[..., 1])
+            self._seam_slots = (pairs.astype(np.int32), poles.astype(np.int32))
+        return self._seam_slots
+
+    def _same_vertices_at(self, x: int, y: int) -> List[GeodesicVertex]:
+        """
+        Returns the other vertices at the same point on the sphere as the vertex at (x, y), None if there are none.
+        """
+        if self._same_slots is None:
+            pairs, poles = self._find_same_vertices()
+            same: Dict[int, List[int]] = {}
+            for a, b in pairs.tolist():
+                same[a] = [b]
+                same[b] = [a]
+            for pole in poles.tolist():
+                for a in pole:
+                    same[a] = [b for b in pole if b != a]
+            self._same_slots = same
+        slots = self._same_slots.get(int(self._slot(x, y)))
+        if slots is None:
+            return None
+        all_vertices = self.get_all_vertices()
+        return [all_vertices[i] for i in slots]
 
     # increase frequency
-    def split(self, frequency):
+    def split(self, frequency, workers: int = None, progress: Callable[[int, int], None] = None):
+        """
+        Subdivides every edge of the dome into frequency pieces.
+
+        :param frequency: The split frequency.
+        :param workers: The number of processes an array-backed dome (see from_frequency()) computes the
+               new vertices in, None for this process only.  The result is the same to the bit.
+               A dome whose GeodesicVertex objects have been created is always split in this process.
+        :param progress: Called with (steps done, steps in total) as the split goes on, or None.
+               The steps are the pairs of x-columns, or the chunks of an array-backed dome.
+        :return: None
+        """
+        if self._vertices is None:
+            self._split_arrays(frequency, workers, progress)
+            return
+
         self.frequency *= frequency
         self.x_max *= frequency
         self.y_max *= frequency
@@ -356,29 +1219,21 @@ class GeodesicDome(IGeodesicDome, Manifold):
                 index: int = i * frequency + k + 1
                 new_vertices[index] = [None] * length
 
-            # fill-in key horizontals.
+            # fill-in key horizontals.  Both columns are contiguous in y, so the vertex of the right
+            # column at the height of a left one is found by its offset from the bottom.
             horiindex = []
             for n in range(len(new_x_vertices1) - 1, -1, -frequency):
                 left: GeodesicVertex = new_x_vertices1[n]
-                # print(f'left.y: {left.y}')
-                right: GeodesicVertex = None
-                right_y: int = 0
-                for m in range(len(new_x_vertices2) - 1, -1, -1):
-                    testing: GeodesicVertex = new_x_vertices2[m]
-                    # print(f'testing: {testing.y}')
-                    if testing.y == left.y:
-                        right = testing
-                        right_y = m
-                        horiindex.append([n, m])
-                        break
-                if right is not None:
-                    inserting: List[GeodesicVertex] = _partition(frequency, left, right)
+                m = left.y - RB.y
+                if 0 <= m < len(new_x_vertices2):
+                    horiindex.append([n, m])
+                    inserting: List[GeodesicVertex] = _partition(frequency, left, new_x_vertices2[m])
                     for v in inserting:
-                        new_vertices[v.x][right_y] = v
+                        new_vertices[v.x][m] = v
 
             # fill-in diagonals
             base_index = i * frequency
-            print(f'base_index: {base_index}')
+            _logger.debug('base_index: %d', base_index)
             for hi in range(len(horiindex) - 1):
                 [h_index, m] = horiindex[hi]
                 for h_count in range(2, frequency + 1):
@@ -399,15 +1254,55 @@ class GeodesicDome(IGeodesicDome, Manifold):
 
             # ready for the next iteration
             new_x_vertices1 = new_x_vertices2
+            if progress is not None:
+                progress(i + 1, len(self.vertices) - 1)
 
         self.vertices = new_vertices
-        self._find_same_vertices()
+        self._link_vertices()
+
+    def _split_arrays(self, frequency: int, workers: int = None, progress: Callable[[int, int], None] = None) -> None:
+        """
+        split() for an array-backed dome.
+        """
+        col_lo, col_hi = self._layout()
+        self.frequency *= frequency
+        self.x_max *= frequency
+        self.y_max *= frequency
+        self.arcLength /= frequency
+        self._col_lo, self._col_hi, xyz = _subdivide(col_lo, col_hi, self._buffers.xyz, frequency, workers, progress)
+        self._buffers = VertexBuffers(xyz)
+        self._invalidate()
+
+    def refined(self, frequency: int, workers: int = None) -> 'GeodesicDome':
+        """
+        Returns a new array-backed dome split from this one, which is left as it is.  The vertex at (x, y)
+        of this dome is the vertex at (x * frequency, y * frequency) of the new one, with the same coordinates.
+
+        :param frequency: The split frequency.
+        :param workers: The number of processes to split in, see split().
+        :return: The new dome, of frequency self.frequency * frequency.
+        """
+        col_lo, col_hi = self._layout()
+        dome = type(self).from_frequency(1)
+        dome.frequency = self.frequency
+        dome.x_max = self.x_max
+        dome.y_max = self.y_max
+        dome.arcLength = self.arcLength
+        dome._col_lo = col_lo
+        dome._col_hi = col_hi
+        dome._buffers = VertexBuffers(self.get_all_xyz())
+        dome._invalidate()
+        dome.split(frequency, workers)
+        return dome
 
     def get_all_vertices(self) -> List[GeodesicVertex]:
-        all_vertices: List[GeodesicVertex] = []
-        for l in self.vertices:
-            all_vertices.extend(l)
-        return all_vertices
+        if self._all_vertices is None:
+            all_vertices: List[GeodesicVertex] = []
+            for l in self.vertices:
+                all_vertices.extend(l)
+            self._all_vertices = all_vertices
+            self._updateIDs()
+        return self._all_vertices
 
     def get_vertex_at(self, x, y) -> GeodesicVertex:
         v: GeodesicVertex
@@ -419,6 +1314,10 @@ class GeodesicDome(IGeodesicDome, Manifold):
             if y >= offset and y < (len(xVector) + offset):
                 return xVector[y - offset]
 
+    def get_number_of_vertices(self) -> int:
+        col_lo, col_hi = self._layout()
+        return int(np.sum(col_hi - col_lo + 1))
+
     def get_number_of_vertices_per_face(self) -> int:
         return 3
 
@@ -433,35 +1332,17 @@ class GeodesicDome(IGeodesicDome, Manifold):
             for v in x_list:
                 v.visited = False
 
-    def _build_faces(self) -> List[GeodesicVertex]:
-        self._updateIDs()
-        vNum = 3 * 20 * self.frequency * self.frequency
-        self.triangles: List[GeodesicVertex] = [None] * vNum
-        index = 0
-        for i in range(len(self.vertices) - 1):
-            # print(f'builsing face at : {i}')
-            current_x: List[GeodesicVertex] = self.vertices[i]
-            next_x: List[GeodesicVertex] = self.vertices[i + 1]
-            next_bottom_y = next_x[0].y
-            for j in range(len(current_x) - 1):
-                if current_x[j].y == next_bottom_y:  # found the starting point
-                    for k in range(j, len(current_x) - 1):
-                        #  triangle 1
-                        self.triangles[index] = current_x[k]  # v1
-                        self.triangles[index + 1] = next_x[k - j]  # v2
-                        self.triangles[index + 2] = next_x[k - j + 1]  # v3
-
-                        # triangle 2
-                        self.triangles[index + 3] = self.triangles[index]
-                        self.triangles[index + 4] = self.triangles[index + 2]
-                        self.triangles[index + 5] = current_x[k + 1]  # v4
-                        index += 6
-                    break
+    def _build_face_indices(self) -> ndarray:
+        return _triangle_slots(*self._layout())
 
+    def _build_faces(self) -> List[GeodesicVertex]:
+        all_vertices: List[GeodesicVertex] = self.get_all_vertices()
+        self.triangles = [all_vertices[i] for i in self.face_indices().ravel()]
         return self.triangles
 
     def get_faces(self) -> List[GeodesicVertex]:
-        self._build_faces()
+        if self.triangles is None:
+            self._build_faces()
         return self.triangles
 
     def get_neighbours(self, v: GeodesicVertex, visit_same_vertex: bool) -> List[GeodesicVertex]:
@@ -0,0 +1,178 @@
+from typing import Iterable, List
+
+import numpy as np
+from numpy import ndarray
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+
+
+class LevelMap:
+    """
+    The index maps between a coarse dome and a fine dome split from it, over canonical vertex IDs.
+
+    A fine vertex lies in a coarse triangle at lattice coordinates that are multiples of 1 / ratio,
+    and its interpolation weights are the barycentric coordinates in the lattice of that triangle,
+    exactly 1 at the corner for a fine vertex that is also a coarse vertex.
+    """
+
+    def __init__(self, coarse: GeodesicDome, fine: GeodesicDome, ratio: int):
+        """
+        :param coarse: The coarse dome.
+        :param fine: The dome split from it by ratio, see GeodesicDome.refined().
+        :param ratio: fine.frequency // coarse.frequency.
+        """
+        self.ratio = ratio
+        r = ratio
+        col_lo, col_hi = coarse._layout()
+        coarse.canonical_ids
+        fine_ids = fine.canonical_ids
+
+        # (Nc,) fine vertex of every coarse vertex
+        cx, cy = coarse.grid_xy[coarse._first_slots].T
+        self.coarse_to_fine: ndarray = fine_ids[fine._slot(cx * r, cy * r)].astype(np.int32)
+
+        # the cell (x, y) of the coarse grid holds the triangles (x, y), (x + 1, y), (x + 1, y + 1) and
+        # (x, y), (x + 1, y + 1), (x, y + 1), for col_lo[x + 1] <= y < col_hi[x].  A fine vertex on the
+        # right or the top edge of a cell may have no cell to its top right, it is then in the cell to its
+        # left, below or both.
+        fx, fy = fine.grid_xy[fine._first_slots].T.astype(np.int64)
+        x, u = np.divmod(fx, r)
+        y, v = np.divmod(fy, r)
+        missing = np.ones(len(fx), dtype=bool)
+        for dx, dy in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+            px, py = x - dx, y - dy
+            inside = (px >= 0) & (px < len(col_lo) - 1)
+            px = np.where(inside, px, 0)
+            found = missing & inside & (u * dx == 0) & (v * dy == 0) & (py >= col_lo[px + 1]) & (py < col_hi[px])
+            x[found] -= dx
+            u[found] += dx * r
+            y[found] -= dy
+            v[found] += dy * r
+            missing &= ~found
+
+        cells = np.maximum(col_hi[:-1] - col_lo[1:], 0)
+        cell_start = np.cumsum(cells) - cells
+        second = v > u
+        # (Nf,) coarse triangle of every fine vertex, a row of coarse.face_indices()
+        self.fine_to_coarse_face: ndarray = (2 * (cell_start[x] + y - col_lo[x + 1]) + second).astype(np.int32)
+        # (Nf, 3) canonical IDs of the corners of that triangle and the weights of the fine vertex in it
+        self.corners: ndarray = coarse.welded_faces[self.fine_to_coarse_face]
+        weights = np.where(second[:, np.newaxis],
+                           np.stack([r - v, u, v - u], axis=1),
+                           np.stack([r - u, u - v, v], axis=1))
+        self.weights: ndarray = weights / r
+        # (Nf,) the coarse vertex closest to every fine vertex in the lattice
+        self.fine_to_coarse_vertex: ndarray = self.corners[np.arange(len(fx)), np.argmax(weights, axis=1)]
+        # the sum of the weights given to every coarse vertex, for the averaging restriction
+        self.coverage: ndarray = np.bincount(self.corners.ravel(), self.weights.ravel(), len(cx))
+
+    def prolong(self, values: ndarray) -> ndarray:
+        """
+        Interpolates per-vertex values from the coarse dome to the fine dome.
+
+        :param values: (Nc,) or (Nc, c) values of the coarse canonical vertices.
+        :return: (Nf,) or (Nf, c) values of the fine canonical vertices.
+        """
+        values = np.asarray(values)
+        weights = self.weights.reshape(self.weights.shape + (1,) * (values.ndim - 1))
+        return np.sum(values[self.corners] * weights, axis=1)
+
+    def restrict(self, values: ndarray, method: str = 'average') -> ndarray:
+        """
+        Carries per-vertex values from the fine dome down to the coarse dome.
+
+        :param values: (Nf,) or (Nf, c) values of the fine canonical vertices.
+        :param method: 'average' for the mean of the fine values around every coarse vertex, weighted
+               as in prolong(), or 'injection' for the value of the fine vertex at every coarse vertex.
+        :return: (Nc,) or (Nc, c) values of the coarse canonical vertices.
+        """
+        values = np.asarray(values)
+        if method == 'injection':
+            return values[self.coarse_to_fine]
+        if method != 'average':
+            raise ValueError(f'unknown restriction method: {method}')
+        ids = self.corners.ravel()
+        columns = values.reshape(len(values), -1)
+        out = np.empty((len(self.coverage), columns.shape[1]))
+        for k in range(columns.shape[1]):
+            weighted = self.weights * columns[:, k, np.newaxis]
+            out[:, k] = np.bincount(ids, weighted.ravel(), len(self.coverage)) / self.coverage
+        return out.reshape((len(self.coverage),) + values.shape[1:])
+
+
+class DomeHierarchy:
+    """
+    Geodesicdomes of several frequencies, each split from the one before it, with the maps between them.
+
+    Every level is a dome of its own, so the coarse levels stay usable after the fine ones are made.
+    The levels above the first are split more than once, locate() and bin() walk their points to the
+    triangles and the vertices the lattice guess misses.
+    Per-vertex values are arrays with one row per canonical vertex (see GeodesicDome.canonical_ids),
+    moved between the levels with prolong() and restrict():
+
+        hierarchy = DomeHierarchy([8, 32, 128])
+        solution = hierarchy.prolong(coarse_solution, 0, 2)
+    """
+
+    def __init__(self, frequencies: Iterable[int], workers: int = None):
+        """
+        :param frequencies: The frequencies of the levels from the coarsest up, each a multiple of the one before.
+        :param workers: The number of processes to split the domes in, see GeodesicDome.split().
+        """
+        self.frequencies: List[int] = [int(f) for f in frequencies]
+        if not self.frequencies:
+            raise ValueError('a hierarchy needs at least one frequency')
+        for coarse, fine in zip(self.frequencies, self.frequencies[1:]):
+            if fine <= coarse or fine % coarse != 0:
+                raise ValueError(f'frequency {fine} is not a multiple of {coarse} greater than it')
+        self.domes: List[GeodesicDome] = [GeodesicDome.from_frequency(self.frequencies[0], workers=workers)]
+        # maps[i] maps between the levels i and i + 1
+        self.maps: List[LevelMap] = []
+        for coarse, fine in zip(self.frequencies, self.frequencies[1:]):
+            self.domes.append(self.domes[-1].refined(fine // coarse, workers))
+            self.maps.append(LevelMap(self.domes[-2], self.domes[-1], fine // coarse))
+
+    def __len__(self) -> int:
+        return len(self.domes)
+
+    def __getitem__(self, level: int) -> GeodesicDome:
+        return self.domes[level]
+
+    def coarse_to_fine(self, level: int, to_level: int = None) -> ndarray:
+        """
+        Returns the canonical ID at level to_level (level + 1 by default) of every canonical vertex of level.
+        """
+        to_level = level + 1 if to_level is None else to_level
+        ids = np.arange(len(self.domes[level].welded_xyz), dtype=np.int32)
+        for i in range(level, to_level):
+            ids = self.maps[i].coarse_to_fine[ids]
+        return ids
+
+    def prolong(self, values: ndarray, level: int, to_level: int = None) -> ndarray:
+        """
+        Interpolates per-vertex values from a level to a finer one, a level at a time.
+
+        :param values: (N, ...) values of the canonical vertices of level.
+        :param level: The level of the values.
+        :param to_level: The finer level, level + 1 by default.
+        :return: The values of the canonical vertices of to_level.
+        """
+        to_level = level + 1 if to_level is None else to_level
+        for i in range(level, to_level):
+            values = self.maps[i].prolong(values)
+        return values
+
+    def restrict(self, values: ndarray, level: int, to_level: int = None, method: str = 'average') -> ndarray:
+        """
+        Carries per-vertex values from a level down to a coarser one, a level at a time.
+
+        :param values: (N, ...) values of the canonical vertices of level.
+        :param level: The level of the values.
+        :param to_level: The coarser level, level - 1 by default.
+        :param method: 'average' or 'injection', see LevelMap.restrict().
+        :return: The values of the canonical vertices of to_level.
+        """
+        to_level = level - 1 if to_level is None else to_level
+        for i in range(level - 1, to_level - 1, -1):
+            values = self.maps[i].restrict(values, method)
+        return values
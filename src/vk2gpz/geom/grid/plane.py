@@ -1,8 +1,19 @@
 from enum import Enum
-from typing import List
+from typing import Dict, List, Tuple, Union
 
+import numpy as np
+from numpy import ndarray
+
+from vk2gpz.geom import graph
 from vk2gpz.geom.manifold import Manifold
-from vk2gpz.geom.vertex import Vertex
+from vk2gpz.geom.vertex import Vertex, VertexBuffers
+
+
+def _hex_length(dq: ndarray, dr: ndarray) -> ndarray:
+    """
+    Returns the number of steps of the hexagonal lattice an axial offset (dq, dr) takes.
+    """
+    return (np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2
 
 
 class Lattice(Enum):
@@ -16,240 +27,408 @@ class Topology(Enum):
 
 
 class PlaneVertex(Vertex):
+    __slots__ = ('lattice',)
 
     def __init__(self, x: int, y: int, lattice=Lattice.Hexagonal):
         super().__init__(x, y)
-        match lattice:
-            case Lattice.Hexagonal:
-                self.coord[1] = y
-                self.coord[2] = 0
-                if y % 2 == 0:
-                    self.coord[0] = x
-                else:
-                    self.coord[0] = (x + 0.5)
-            case Lattice.Rectilinear:
-                self.coord[0] = x
-                self.coord[1] = y
-                self.coord[2] = 0
+        self.lattice: Lattice = lattice
+
+    def _initial_coord(self) -> ndarray:
+        coord = np.array([self.x, self.y, 0.0])
+        if self.lattice == Lattice.Hexagonal and self.y % 2 != 0:
+            coord[0] += 0.5
+        return coord
 
 
 class Plane(Manifold):
+    """
+    A regular grid of x * y vertices, stored as arrays.  The coordinates are computed for the whole
+    grid at once, and a PlaneVertex is only created when it is asked for.
+    """
+
     def __init__(self, x, y, lattice=Lattice.Hexagonal, topology=Topology.Plane):
         super().__init__()
         self.lattice: Lattice = lattice
         self.topology: Topology = topology
         self.x = x
         self.y = y
-        self.vertices: List[Vertex] = [None] * self.x * self.y
-        for i in range(y):
-            for j in range(x):
-                self.vertices[i * self.x + j] = PlaneVertex(j, i, self.lattice)
-        self.faces: List[Vertex] = []
+        # the vertices asked for one by one, by ID, until get_all_vertices() creates them all
+        self._vertices: Dict[int, PlaneVertex] = {}
+        self._all_vertices: List[PlaneVertex] = None
+        self.faces: List[Vertex] = None
+
+    def _vertex_buffers(self) -> VertexBuffers:
+        if self._buffers is None:
+            self._buffers = VertexBuffers(self._grid_xyz())
+        return self._buffers
+
+    def _vertex(self, i: int) -> PlaneVertex:
+        """
+        Returns the vertex with the ID i, creating it on first use.
+        """
+        if self._all_vertices is not None:
+            return self._all_vertices[i]
+        v = self._vertices.get(i)
+        if v is None:
+            y, x = divmod(i, self.x)
+            v = self._new_vertex(x, y, i)
+        return v
+
+    def _new_vertex(self, x: int, y: int, i: int) -> PlaneVertex:
+        v = PlaneVertex(x, y, self.lattice)
+        v.id = i
+        v.bind(self._vertex_buffers(), i)
+        self._vertices[i] = v
+        return v
+
+    @property
+    def vertices(self) -> List[Vertex]:
+        return self.get_all_vertices()
+
+    def _grid_xyz(self) -> ndarray:
+        """
+        Returns the coordinates of all the vertices, the same as PlaneVertex computes them one by one.
+        """
+        xyz = np.zeros((self.y, self.x, 3))
+        xyz[:, :, 0] = np.arange(self.x)
+        xyz[:, :, 1] = np.arange(self.y)[:, np.newaxis]
+        if self.lattice == Lattice.Hexagonal:
+            xyz[1::2, :, 0] += 0.5
+        return xyz.reshape(-1, 3)
+
+    @property
+    def grid_xy(self) -> ndarray:
+        """
+        (N, 2) (x, y) locations of all the vertices in get_all_vertices() order.
+        """
+        ids = np.arange(self.x * self.y, dtype=np.int32)
+        return np.stack([ids % self.x, ids // self.x], axis=1)
 
     def get_all_vertices(self) -> List[Vertex]:
-        return self.vertices
+        if self._all_vertices is None:
+            vertices: List[PlaneVertex] = [None] * self.x * self.y
+            created = self._vertices
+            buffers = self._vertex_buffers()
+            columns = list(range(self.x))  # every vertex of a column shares one int object for its x
+            index = 0
+            for i in range(self.y):
+                for j in columns:
+                    v = created.get(index) if created else None
+                    if v is None:
+                        v = PlaneVertex(j, i, self.lattice)
+                        v.id = index
+                        v.bind(buffers, index)
+                    vertices[index] = v
+                    index += 1
+            self._all_vertices = vertices
+            self._vertices = {}
+        return self._all_vertices
+
+    def get_number_of_vertices(self) -> int:
+        return self.x * self.y
+
+    def unmark_vertices(self) -> None:
+        # only the vertices that exist can have been marked
+        vertices = self._all_vertices if self._all_vertices is not None else self._vertices.values()
+        for v in vertices:
+            v.visited = False
 
     def get_vertex_at(self, x, y):
         if (x < self.x) and (y < self.y) and (x >= 0) and (y >= 0):
-            index = y * self.x + x
-            return self.vertices[index]
+            return self._vertex(y * self.x + x)
         return None
 
     def get_number_of_vertices_per_face(self) -> int:
         return 3 if self.lattice == Lattice.Hexagonal else 4
 
     def get_faces(self) -> List[Vertex]:
-        # print(f'lattice: {self.lattice}')
-        if self.lattice == Lattice.Hexagonal:
-            self._build_faces_hex()
-        elif self.lattice == Lattice.Rectilinear:
-            self._build_faces_recti()
+        if self.faces is None:
+            vertices = self.get_all_vertices()
+            self.faces = [vertices[i] for i in self.face_indices().ravel().tolist()]
         return self.faces
 
+    def _build_face_indices(self) -> ndarray:
+        """
+        Builds the faces of all the cells at once from the ID of their first vertex.  A hexagonal cell is
+        split into two triangles along the diagonal that follows the row parity, a rectilinear one is a quad.
+        """
+        first = (np.arange(self.y - 1)[:, np.newaxis] * self.x + np.arange(self.x - 1)).astype(np.int32)
+        if self.lattice == Lattice.Rectilinear:
+            return np.stack([first, first + 1, first + self.x + 1, first + self.x], axis=-1).reshape(-1, 4)
+
+        x = self.x
+        # the corners of the two triangles of a cell, as offsets from its first vertex
+        even = np.array([[0, 1, x], [1, x + 1, x]], dtype=np.int32)
+        odd = np.array([[0, 1, x + 1], [0, x + 1, x]], dtype=np.int32)
+        faces = np.empty((self.y - 1, self.x - 1, 2, 3), dtype=np.int32)
+        faces[0::2] = first[0::2, :, np.newaxis, np.newaxis] + even
+        faces[1::2] = first[1::2, :, np.newaxis, np.newaxis] + odd
+        return faces.reshape(-1, 3)
+
     def get_neighbours(self, v: Vertex, visit_same_vertex: bool) -> List[Vertex]:
         v.visited = True
-        x = v.x
-        y = v.y
 
         # find the neighbors
         neighbours: List[Vertex] = []
-
-        # x + 1, y
-        x1 = x + 1
-        if x1 >= self.x:
-            if self.topology == Topology.Donut:
-                x1 = 0
-            elif self.topology == Topology.Plane:
-                x1 = -1
-        if x1 > -1:
-            nv = self.vertices[y * self.x + x1]
+        for i in self._neighbour_indices(v.x, v.y):
+            nv = self._vertex(i)
             if not nv.visited:
                 nv.visited = True
                 neighbours.append(nv)
 
-        # x - 1, y
-        x_1 = x - 1
-        if x_1 < 0:
-            if self.topology == Topology.Donut:
-                x_1 = self.x - 1
-            elif self.topology == Topology.Plane:
-                x_1 = -1
-        if x_1 > -1:
-            nv = self.vertices[y * self.x + x_1]
-            if not nv.visited:
-                nv.visited = True
-                neighbours.append(nv)
+        return neighbours
 
-        # x, y - 1
-        y_1 = y - 1
-        if y_1 < 0:
-            if self.topology == Topology.Donut:
-                y_1 = self.y - 1
-            else:
-                y_1 = -1
-        if self.lattice == Lattice.Hexagonal:
-            if y % 2 == 0:
-                x1 = x - 1
-                x2 = x
-                if x1 < 0:
-                    if self.topology == Topology.Donut:
-                        x1 = self.x - 1
-                    elif self.topology == Topology.Plane:
-                        x1 = -1
-                if x1 > -1 and y_1 > -1:
-                    nv = self.vertices[y_1 * self.x + x1]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-                if x2 > -1 and y_1 > -1:
-                    nv = self.vertices[y_1 * self.x + x2]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-            else:
-                x1 = x
-                x2 = x + 1
-                if x2 > self.x - 1:
-                    if self.topology == Topology.Donut:
-                        x2 = 0
-                    elif self.topology == Topology.Plane:
-                        x2 = -1
-                if x2 > -1 and y_1 > -1:
-                    nv = self.vertices[y_1 * self.x + x2]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-                if x1 > -1 and y_1 > -1:
-                    nv = self.vertices[y_1 * self.x + x1]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-        elif self.lattice == Lattice.Rectilinear:
-            if y_1 > -1:
-                nv = self.vertices[y_1 * self.x + x]
-                if not nv.visited:
-                    nv.visited = True
-                    neighbours.append(nv)
-
-        # x, y + 1
-        y1 = y + 1
-        if y1 > self.y - 1:
-            if self.topology == Topology.Donut:
-                y1 = 0
-            else:
-                y1 = -1
-        if self.lattice == Lattice.Hexagonal:
-            if y % 2 == 0:
-                x1 = x - 1
-                x2 = x
-                if x1 < 0:
-                    if self.topology == Topology.Donut:
-                        x1 = self.x - 1
-                    elif self.topology == Topology.Plane:
-                        x1 = -1
-                if x1 > -1 and y1 > -1:
-                    nv = self.vertices[y1 * self.x + x1]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-                if x2 > -1 and y1 > -1:
-                    nv = self.vertices[y1 * self.x + x2]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-            else:
-                x1 = x
-                x2 = x + 1
-                if x2 > self.x - 1:
-                    if self.topology == Topology.Donut:
-                        x2 = 0
-                    elif self.topology == Topology.Plane:
-                        x2 = -1
-                if x2 > -1 and y1 > -1:
-                    nv = self.vertices[y1 * self.x + x2]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-                if x1 > -1 and y1 > -1:
-                    nv = self.vertices[y1 * self.x + x1]
-                    if not nv.visited:
-                        nv.visited = True
-                        neighbours.append(nv)
-        elif self.lattice == Lattice.Rectilinear:
-            if y1 > -1:
-                nv = self.vertices[y1 * self.x + x]
-                if not nv.visited:
-                    nv.visited = True
-                    neighbours.append(nv)
+    def _neighbour_indices(self, x: int, y: int) -> List[int]:
+        """
+        Returns the indices of the immediate neighbours of the vertex at (x, y), in the order
+        get_neighbours() visits them.  On a small Donut the same index, or the vertex itself,
+        may appear more than once.
 
-        return neighbours
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :return: A list of vertex IDs.
+        """
+        indices: List[int] = []
 
-    def _update_ids(self) -> None:
-        serial_number = 0
-        for v in self.vertices:
-            v.id = serial_number
-            serial_number += 1
-
-    def _build_faces_hex(self) -> List[Vertex]:
-        self._update_ids()
-        vNum = (self.x - 1) * 2 * (self.y - 1) * 3
-        self.faces: List[Vertex] = [None] * vNum
-        index = 0
-        for i in range(self.y - 1):
-            for j in range(self.x - 1):
-                self.faces[index] = self.vertices[i * self.x + j]
-                if i % 2 == 0:
-                    self.faces[index + 1] = self.vertices[i * self.x + (j + 1)]
-                    self.faces[index + 2] = self.vertices[(i + 1) * self.x + j]
-
-                    self.faces[index + 3] = self.vertices[i * self.x + (j + 1)]
-                    self.faces[index + 4] = self.vertices[(i + 1) * self.x + (j + 1)]
-                    self.faces[index + 5] = self.vertices[(i + 1) * self.x + j]
+        def add(nx: int, ny: int) -> None:
+            if self.topology == Topology.Donut:
+                nx %= self.x
+                ny %= self.y
+            if (0 <= nx < self.x) and (0 <= ny < self.y):
+                indices.append(ny * self.x + nx)
+
+        # x + 1, y and x - 1, y
+        add(x + 1, y)
+        add(x - 1, y)
+
+        # x, y - 1 and x, y + 1
+        for ny in (y - 1, y + 1):
+            if self.lattice == Lattice.Hexagonal:
+                if y % 2 == 0:
+                    add(x - 1, ny)
+                    add(x, ny)
                 else:
-                    self.faces[index + 1] = self.vertices[i * self.x + (j + 1)]
-                    self.faces[index + 2] = self.vertices[(i + 1) * self.x + (j + 1)]
+                    add(x + 1, ny)
+                    add(x, ny)
+            elif self.lattice == Lattice.Rectilinear:
+                add(x, ny)
 
-                    self.faces[index + 3] = self.vertices[i * self.x + j]
-                    self.faces[index + 4] = self.vertices[(i + 1) * self.x + (j + 1)]
-                    self.faces[index + 5] = self.vertices[(i + 1) * self.x + j]
+        return indices
 
-                index += 6
-        return self.faces
+    def get_vertex_id(self, v: Vertex) -> int:
+        return v.y * self.x + v.x
 
-    def _build_faces_recti(self) -> List[Vertex]:
-        self._update_ids()
-        vNum = (self.x - 1) * (self.y - 1)
-        self.faces: List[Vertex] = [None] * vNum * self.get_number_of_vertices_per_face()
-        index = 0
-        for i in range(self.y - 1):
-            for j in range(self.x - 1):
-                self.faces[index] = self.vertices[i * self.x + j]
-                self.faces[index + 1] = self.vertices[i * self.x + (j + 1)]
-                self.faces[index + 2] = self.vertices[(i + 1) * self.x + (j + 1)]
-                self.faces[index + 3] = self.vertices[(i + 1) * self.x + j]
-                index += 4
+    def get_vertex_by_id(self, i: int) -> Vertex:
+        return self._vertex(i)
 
-        return self.faces
+    def adjacency(self) -> Tuple[ndarray, ndarray]:
+        if self._adjacency is None:
+            indptr, indices = graph.csr_from_table(self.neighbour_table())
+            indptr.flags.writeable = False
+            indices.flags.writeable = False
+            self._adjacency = (indptr, indices)
+        return self._adjacency
+
+    def _neighbour_offsets(self) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the (dx, dy) offsets of the neighbours in _neighbour_indices() order, one row per row parity.
+
+        :return: (2, k) dx and (k,) dy
+        """
+        if self.lattice == Lattice.Hexagonal:
+            dx = np.array([[1, -1, -1, 0, -1, 0],
+                           [1, -1, 1, 0, 1, 0]])
+            dy = np.array([0, 0, -1, -1, 1, 1])
+        else:
+            dx = np.array([[1, -1, 0, 0]] * 2)
+            dy = np.array([0, 0, -1, 1])
+        return dx, dy
+
+    def neighbour_table(self) -> ndarray:
+        """
+        Returns the neighbours of all the vertices as a (N, 6) array for the hexagonal lattice, (N, 4) for
+        the rectilinear one, computed from the fixed offsets of the lattice.  The neighbours of each vertex
+        are in the order get_neighbours() visits them, followed by -1 for the missing ones: the ones off the
+        edges of a Plane, and on a Donut too small for them to be distinct, the repeated ones and the vertex itself.
+
+        :return: (N, 6) or (N, 4) int32 array
+        """
+        if self._neighbour_table is None:
+            dx, dy = self._neighbour_offsets()
+            table = np.empty((self.y, self.x, len(dy)), dtype=np.int32)
+            nx = np.arange(self.x)[:, np.newaxis] + dx[:, np.newaxis, :]  # (parity, x, k)
+            if self.topology == Topology.Donut:
+                nx %= self.x
+            for parity in (0, 1):
+                rows = np.arange(parity, self.y, 2)
+                ny = rows[:, np.newaxis] + dy
+                if self.topology == Topology.Donut:
+                    ny %= self.y
+                table[parity::2] = ny[:, np.newaxis, :] * self.x + nx[parity]
+                if self.topology == Topology.Plane:
+                    inside = (nx[parity] >= 0) & (nx[parity] < self.x) & ((ny >= 0) & (ny < self.y))[:, np.newaxis, :]
+                    table[parity::2][~inside] = -1
+            table = table.reshape(-1, len(dy))
+            if self.topology == Topology.Donut and (self.x < 3 or self.y < 3):
+                self._drop_repeated(table)
+            # only the rows with missing neighbours have to be packed
+            missing = np.flatnonzero(np.any(table < 0, axis=1))
+            table[missing] = self._pack(table[missing])
+            table.flags.writeable = False
+            self._neighbour_table = table
+        return self._neighbour_table
+
+    @staticmethod
+    def _drop_repeated(table: ndarray) -> None:
+        """
+        Replaces with -1 the neighbours that are the vertex itself or repeat an earlier one.
+        """
+        ids = np.arange(len(table))
+        repeated = table == ids[:, np.newaxis]
+        for k in range(1, table.shape[1]):
+            repeated[:, k] |= np.any(table[:, :k] == table[:, k:k + 1], axis=1)
+        table[repeated] = -1
+
+    @staticmethod
+    def _pack(table: ndarray) -> ndarray:
+        """
+        Moves the -1 entries of every row to its end, keeping the order of the others.
+        """
+        order = np.argsort(table < 0, axis=1, kind='stable')
+        return np.take_along_axis(table, order, axis=1)
+
+    def _analytic(self) -> bool:
+        """
+        False for a hexagonal Donut of odd height: its wrap is not a translation of the lattice,
+        so its rings and distances are found in the adjacency instead.
+        """
+        return not (self.lattice == Lattice.Hexagonal and self.topology == Topology.Donut and self.y % 2 != 0)
+
+    @staticmethod
+    def _axial(x: ndarray, y: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        Converts the offset (x, y) locations of the hexagonal lattice, odd rows shifted right, to axial (q, r).
+        """
+        return x - (y - (y & 1)) // 2, y
+
+    @staticmethod
+    def _offset(q: ndarray, r: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        Converts axial (q, r) back to offset (x, y) locations.
+        """
+        return q + (r - (r & 1)) // 2, r
+
+    def distance(self, a_ids, b_ids) -> ndarray:
+        """
+        Returns the number of edges between vertices, computed from their locations: the hexagonal
+        distance of the axial coordinates, or the Manhattan distance on the rectilinear lattice,
+        whose vertices have 4 neighbours.  On a Donut it is the shortest over the wrapped copies.
+
+        :param a_ids: Vertex IDs.
+        :param b_ids: Vertex IDs, broadcast against a_ids.
+        :return: int64 array of the distances
+        """
+        a_ids, b_ids = np.broadcast_arrays(np.asarray(a_ids, dtype=np.int64), np.asarray(b_ids, dtype=np.int64))
+        if not self._analytic():
+            return self._graph_distance(a_ids, b_ids)
+        ay, ax = np.divmod(a_ids, self.x)
+        by, bx = np.divmod(b_ids, self.x)
+        if self.lattice == Lattice.Rectilinear:
+            dx = np.abs(bx - ax)
+            dy = np.abs(by - ay)
+            if self.topology == Topology.Donut:
+                dx = np.minimum(dx, self.x - dx)
+                dy = np.minimum(dy, self.y - dy)
+            return dx + dy
+
+        aq, ar = self._axial(ax, ay)
+        bq, br = self._axial(bx, by)
+        dq = bq - aq
+        dr = br - ar
+        if self.topology == Topology.Plane:
+            return _hex_length(dq, dr)
+        # the Donut repeats the lattice every x columns, (x, 0) in axial coordinates, and every y rows,
+        # (-y / 2, y).  For each number of rows the best number of columns brackets the shortest q.
+        best = None
+        for n in (-1, 0, 1):
+            shift = np.floor_divide(-dr, self.y) + n
+            q = np.mod(dq - shift * (self.y // 2), self.x)
+            r = dr + shift * self.y
+            length = np.minimum(_hex_length(q, r), _hex_length(q - self.x, r))
+            best = length if best is None else np.minimum(best, length)
+        return best
+
+    def ring(self, v: Union[Vertex, int], k: int) -> ndarray:
+        """
+        Returns the IDs of the vertices at the distance k from a vertex, in the order they are walked
+        around it, without searching the graph.
+
+        :param v: The vertex, or its ID.
+        :param k: The distance.
+        :return: int32 array of vertex IDs
+        """
+        seed = v if isinstance(v, (int, np.integer)) else self.get_vertex_id(v)
+        if k == 0:
+            return np.array([seed], dtype=np.int32)
+        if not self._analytic():
+            return self.k_ring(seed, k)[-1]
+
+        y, x = divmod(int(seed), self.x)
+        steps = np.arange(k)
+        if self.lattice == Lattice.Hexagonal:
+            q, r = self._axial(x, y)
+            qs, rs = [], []
+            # start k steps towards (-1, +1) and walk the six sides
+            cq, cr = q - k, r + k
+            for dq, dr in ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)):
+                qs.append(cq + steps * dq)
+                rs.append(cr + steps * dr)
+                cq, cr = cq + k * dq, cr + k * dr
+            xs, ys = self._offset(np.concatenate(qs), np.concatenate(rs))
+        else:
+            xs = np.concatenate([x + k - steps, x - steps, x - k + steps, x + steps])
+            ys = np.concatenate([y + steps, y + k - steps, y - steps, y - k + steps])
+
+        if self.topology == Topology.Plane:
+            inside = (xs >= 0) & (xs < self.x) & (ys >= 0) & (ys < self.y)
+            return (ys[inside] * self.x + xs[inside]).astype(np.int32)
+        ids = np.mod(ys, self.y) * self.x + np.mod(xs, self.x)
+        # the ring can wrap onto itself and onto vertices closer than k
+        _, first = np.unique(ids, return_index=True)
+        ids = ids[np.sort(first)]
+        return ids[self.distance(seed, ids) == k].astype(np.int32)
+
+    def disk(self, v: Union[Vertex, int], k: int) -> ndarray:
+        """
+        Returns the IDs of the vertices within the distance k of a vertex, the vertex first,
+        then ring(v, 1), ..., ring(v, k).
+
+        :param v: The vertex, or its ID.
+        :param k: The distance.
+        :return: int32 array of vertex IDs
+        """
+        return np.concatenate([self.ring(v, i) for i in range(k + 1)])
+
+    def _graph_distance(self, a_ids: ndarray, b_ids: ndarray) -> ndarray:
+        """
+        distance() found by a breadth-first search from each of the distinct a_ids.
+        """
+        result = np.empty(a_ids.shape, dtype=np.int64)
+        table = self.neighbour_table()
+        for a in np.unique(a_ids):
+            distances = np.full(len(table), -1, dtype=np.int64)
+            distances[a] = 0
+            frontier = np.array([a])
+            level = 0
+            while len(frontier):
+                level += 1
+                candidates = table[frontier].ravel()
+                candidates = candidates[candidates >= 0]
+                frontier = np.unique(candidates[distances[candidates] < 0])
+                distances[frontier] = level
+            where = a_ids == a
+            result[where] = distances[b_ids[where]]
+        return result
 
     def _write_off(self):
         allvertices: List[Vertex] = self.get_all_vertices()
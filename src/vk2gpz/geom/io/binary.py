@@ -0,0 +1,185 @@
+"""
+A compact binary mesh container.
+
+    magic (8 bytes) | version (uint32) | header length (uint32) | JSON header | sections
+
+The JSON header lists the sections with their dtype, shape and byte offset.  Every section starts
+at a multiple of 64 bytes, so the reader can map each of them with np.memmap without copying it:
+opening a file costs the same whatever the size of the mesh, and processes mapping the same
+file read-only share its pages.
+
+Sections: 'xyz' (N, 3) float64 or float32, 'faces' (F, k) int32, and optionally 'grid' (N, 2) int32,
+'canonical_ids' (N,) int32 and per-vertex fields 'field:<name>' (N, ...) of any numeric dtype.
+"""
+import json
+import struct
+from typing import Dict, List
+
+import numpy as np
+from numpy import ndarray
+
+VERSION = 1
+
+_MAGIC = b'VKMESH\x00\x00'
+_PREAMBLE = struct.Struct('<8sII')
+_ALIGN = 64
+_FIELD = 'field:'
+_CHUNK_BYTES = 1 << 24  # sections are converted and written this many bytes at a time
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def write(path: str, xyz: ndarray, faces: ndarray, grid: ndarray = None, canonical_ids: ndarray = None,
+          fields: Dict[str, ndarray] = None, dtype=np.float64, metadata: Dict = None) -> None:
+    """
+    Writes a mesh into a binary mesh file.
+
+    :param path: The file to write.
+    :param xyz: (N, 3) vertex coordinates.
+    :param faces: (F, k) vertex indices of the faces.
+    :param grid: (N, 2) grid locations of the vertices, or None.
+    :param canonical_ids: (N,) canonical vertex IDs, or None.
+    :param fields: per-vertex arrays by name, each with N rows, or None.
+    :param dtype: np.float64 or np.float32, the type the coordinates are stored as.
+    :param metadata: anything JSON serializable to keep with the mesh.
+    :return: None
+    """
+    if np.dtype(dtype) not in (np.dtype(np.float64), np.dtype(np.float32)):
+        raise ValueError(f'unsupported coordinate type: {dtype}')
+    sections = [('xyz', xyz, np.dtype(dtype).newbyteorder('<')),
+                ('faces', faces, np.dtype('<i4'))]
+    if grid is not None:
+        sections.append(('grid', grid, np.dtype('<i4')))
+    if canonical_ids is not None:
+        sections.append(('canonical_ids', canonical_ids, np.dtype('<i4')))
+    for name, a in (fields or {}).items():
+        if len(a) != len(xyz):
+            raise ValueError(f'field {name} has {len(a)} rows for {len(xyz)} vertices')
+        sections.append((_FIELD + name, a, np.asarray(a[:0]).dtype.newbyteorder('<')))
+
+    def header(first_offset: int) -> List[Dict]:
+        entries = []
+        offset = first_offset
+        for name, a, a_dtype in sections:
+            entries.append({'name': name, 'dtype': a_dtype.str, 'shape': list(np.shape(a)), 'offset': offset})
+            offset = _aligned(offset + int(np.prod(np.shape(a))) * a_dtype.itemsize)
+        return entries
+
+    # the header holds the offsets, which depend on the header length: grow it until it fits
+    start = _aligned(_PREAMBLE.size + 256)
+    while True:
+        text = json.dumps({'sections': header(start), 'metadata': metadata or {}}).encode()
+        if _PREAMBLE.size + len(text) <= start:
+            break
+        start = _aligned(_PREAMBLE.size + len(text))
+    entries = header(start)
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(_MAGIC, VERSION, len(text)))
+        f.write(text)
+        for (name, a, a_dtype), entry in zip(sections, entries):
+            f.write(b'\0' * (entry['offset'] - f.tell()))
+            _write_section(f, a, a_dtype)
+
+
+def _write_section(f, a: ndarray, dtype: np.dtype) -> None:
+    a = np.asarray(a)
+    if len(a) == 0:
+        return
+    rows = max(1, _CHUNK_BYTES // max(1, a[0].size * dtype.itemsize))
+    for begin in range(0, len(a), rows):
+        np.ascontiguousarray(a[begin:begin + rows], dtype=dtype).tofile(f)
+
+
+def write_manifold(path: str, manifold, fields: Dict[str, ndarray] = None, dtype=np.float64,
+                   metadata: Dict = None) -> None:
+    """
+    Writes a manifold into a binary mesh file, with its grid locations and canonical IDs if it has them.
+
+    :param path: The file to write.
+    :param manifold: The manifold.
+    :param fields: per-vertex arrays by name, or None.
+    :param dtype: np.float64 or np.float32, the type the coordinates are stored as.
+    :param metadata: anything JSON serializable to keep with the mesh.
+    :return: None
+    """
+    write(path, manifold.get_all_xyz(), manifold.face_indices(),
+          grid=getattr(manifold, 'grid_xy', None), canonical_ids=getattr(manifold, 'canonical_ids', None),
+          fields=fields, dtype=dtype, metadata=metadata)
+
+
+class MeshFile:
+    """
+    A binary mesh file opened for reading.  Each section is a np.memmap of the file, mapped on first use.
+    """
+
+    def __init__(self, path: str, mode: str = 'r'):
+        """
+        :param path: The file to open.
+        :param mode: 'r' to map the sections read-only, 'c' for copy-on-write.
+        """
+        with open(path, 'rb') as f:
+            magic, version, length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != _MAGIC:
+                raise ValueError(f'{path} is not a binary mesh file')
+            if version != VERSION:
+                raise ValueError(f'{path} is version {version}, only version {VERSION} can be read')
+            header = json.loads(f.read(length).decode())
+        self.path = path
+        self.mode = mode
+        self.metadata: Dict = header['metadata']
+        self._entries: Dict[str, Dict] = {entry['name']: entry for entry in header['sections']}
+        self._sections: Dict[str, ndarray] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def section(self, name: str) -> ndarray:
+        """
+        Returns a section by name, None if the file does not have it.
+        """
+        if name not in self._entries:
+            return None
+        if name not in self._sections:
+            entry = self._entries[name]
+            shape = tuple(entry['shape'])
+            if np.prod(shape) == 0:
+                # np.memmap cannot map zero bytes
+                self._sections[name] = np.empty(shape, dtype=entry['dtype'])
+            else:
+                self._sections[name] = np.memmap(self.path, dtype=entry['dtype'], mode=self.mode,
+                                                 offset=entry['offset'], shape=shape)
+        return self._sections[name]
+
+    @property
+    def xyz(self) -> ndarray:
+        return self.section('xyz')
+
+    @property
+    def faces(self) -> ndarray:
+        return self.section('faces')
+
+    @property
+    def grid(self) -> ndarray:
+        return self.section('grid')
+
+    @property
+    def canonical_ids(self) -> ndarray:
+        return self.section('canonical_ids')
+
+    @property
+    def fields(self) -> Dict[str, ndarray]:
+        return {name[len(_FIELD):]: self.section(name) for name in self._entries if name.startswith(_FIELD)}
+
+
+def read(path: str, mode: str = 'r') -> MeshFile:
+    """
+    Opens a binary mesh file.  Nothing but the header is read until a section is used.
+
+    :param path: The file to open.
+    :param mode: 'r' to map the sections read-only, 'c' for copy-on-write.
+    :return: The opened file.
+    """
+    return MeshFile(path, mode)
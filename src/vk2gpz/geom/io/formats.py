@@ -0,0 +1,301 @@
+"""
+Exporters and importers for the usual mesh exchange formats: OFF, PLY (ASCII and binary) and OBJ.
+
+Everything works on (N, 3) coordinate and (F, k) face arrays and streams them through the file
+in chunks of _CHUNK_ROWS rows, so the memory used on top of the mesh stays bounded however large
+the mesh is.  Text is formatted a whole chunk at a time with one '%' operation.
+"""
+import io
+from itertools import islice
+from typing import IO, List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+FORMATS = ('off', 'ply', 'ply-binary', 'obj')
+
+_CHUNK_ROWS = 1 << 16
+
+_PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8',
+}
+
+
+def _chunks(a: ndarray):
+    for begin in range(0, len(a), _CHUNK_ROWS):
+        yield a[begin:begin + _CHUNK_ROWS]
+
+
+def _write_rows(f: IO, a: ndarray, prefix: str, fmt: str) -> None:
+    """
+    Writes the rows of a as lines of text, 'prefix fmt fmt ...'.
+    """
+    if len(a) == 0:
+        return
+    line = prefix + ' '.join([fmt] * a.shape[1]) + '\n'
+    for chunk in _chunks(a):
+        f.write((line * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def write_off(path: str, xyz: ndarray, faces: ndarray) -> None:
+    """
+    Writes a mesh into an OFF file.
+
+    :param path: The file to write.
+    :param xyz: (N, 3) vertex coordinates.
+    :param faces: (F, k) vertex indices of the faces.
+    :return: None
+    """
+    with open(path, 'w') as f:
+        f.write('# OFF Data\n')
+        f.write('OFF\n')
+        f.write(f'{len(xyz)} {len(faces)} 0\n')
+        _write_rows(f, np.asarray(xyz, dtype=np.float64), '', '%r')
+        _write_rows(f, np.asarray(faces), f'{faces.shape[1]} ', '%d')
+
+
+def write_obj(path: str, xyz: ndarray, faces: ndarray) -> None:
+    """
+    Writes a mesh into a Wavefront OBJ file.
+
+    :param path: The file to write.
+    :param xyz: (N, 3) vertex coordinates.
+    :param faces: (F, k) vertex indices of the faces, from 0.
+    :return: None
+    """
+    with open(path, 'w') as f:
+        _write_rows(f, np.asarray(xyz, dtype=np.float64), 'v ', '%r')
+        # OBJ counts the vertices from 1
+        for chunk in _chunks(np.asarray(faces)):
+            _write_rows(f, chunk.astype(np.int64) + 1, 'f ', '%d')
+
+
+def _ply_header(form: str, n_vertices: int, n_faces: int) -> str:
+    return '\n'.join(['ply', f'format {form} 1.0',
+                      f'element vertex {n_vertices}',
+                      'property double x', 'property double y', 'property double z',
+                      f'element face {n_faces}',
+                      'property list uchar int vertex_indices',
+                      'end_header']) + '\n'
+
+
+def write_ply(path: str, xyz: ndarray, faces: ndarray, binary: bool = False) -> None:
+    """
+    Writes a mesh into a PLY file.
+
+    :param path: The file to write.
+    :param xyz: (N, 3) vertex coordinates.
+    :param faces: (F, k) vertex indices of the faces.
+    :param binary: True for binary_little_endian, False for ascii.
+    :return: None
+    """
+    faces = np.asarray(faces)
+    k = faces.shape[1]
+    if not binary:
+        with open(path, 'w') as f:
+            f.write(_ply_header('ascii', len(xyz), len(faces)))
+            _write_rows(f, np.asarray(xyz, dtype=np.float64), '', '%r')
+            _write_rows(f, faces, f'{k} ', '%d')
+        return
+
+    face_dtype = np.dtype([('n', 'u1'), ('v', '<i4', (k,))])
+    with open(path, 'wb') as f:
+        f.write(_ply_header('binary_little_endian', len(xyz), len(faces)).encode('ascii'))
+        for chunk in _chunks(np.asarray(xyz)):
+            np.ascontiguousarray(chunk, dtype='<f8').tofile(f)
+        for chunk in _chunks(faces):
+            records = np.empty(len(chunk), dtype=face_dtype)
+            records['n'] = k
+            records['v'] = chunk
+            records.tofile(f)
+
+
+def export(path: str, xyz: ndarray, faces: ndarray, format: str = 'off') -> None:
+    """
+    Writes a mesh in one of FORMATS.
+
+    :param path: The file to write.
+    :param xyz: (N, 3) vertex coordinates.
+    :param faces: (F, k) vertex indices of the faces.
+    :param format: 'off', 'ply', 'ply-binary' or 'obj'.
+    :return: None
+    """
+    if format == 'off':
+        write_off(path, xyz, faces)
+    elif format == 'ply':
+        write_ply(path, xyz, faces)
+    elif format == 'ply-binary':
+        write_ply(path, xyz, faces, binary=True)
+    elif format == 'obj':
+        write_obj(path, xyz, faces)
+    else:
+        raise ValueError(f'unknown format: {format}')
+
+
+def _parse_lines(f: IO, n: int, dtype) -> ndarray:
+    """
+    Parses the next n lines of numbers, a chunk at a time, into a (n, columns) array.
+    All the lines must have the same number of columns.
+    """
+    rows: List[ndarray] = []
+    columns = None
+    remaining = n
+    while remaining > 0:
+        lines = [line for line in islice(f, min(remaining, _CHUNK_ROWS)) if line.strip() and line[0] != '#']
+        if not lines:
+            raise ValueError(f'the file ends {remaining} lines early')
+        if columns is None:
+            columns = len(lines[0].split())
+        values = np.fromstring(''.join(lines), dtype=dtype, sep=' ')
+        if len(values) != len(lines) * columns:
+            raise ValueError('the lines do not all have the same number of values')
+        rows.append(values.reshape(-1, columns))
+        remaining -= len(lines)
+    if not rows:
+        return np.empty((0, 0), dtype=dtype)
+    return np.concatenate(rows)
+
+
+def _split_faces(rows: ndarray) -> ndarray:
+    """
+    Strips the vertex count off the face rows.
+    """
+    if len(rows) == 0:
+        return np.empty((0, 3), dtype=np.int32)
+    k = rows.shape[1] - 1
+    if np.any(rows[:, 0] != k):
+        raise ValueError('only faces with the same number of vertices are supported')
+    return rows[:, 1:].astype(np.int32)
+
+
+def _header_line(f: IO) -> str:
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError('unexpected end of the header')
+        line = line.split('#', 1)[0].strip()
+        if line:
+            return line
+
+
+def read_off(path: str) -> Tuple[ndarray, ndarray]:
+    """
+    Reads a mesh from an OFF file.  Vertex colours and other extra columns are dropped.
+
+    :param path: The file to read.
+    :return: (N, 3) float64 vertex coordinates and (F, k) int32 faces
+    """
+    with open(path) as f:
+        words = _header_line(f).split()
+        if not words[0].endswith('OFF'):
+            raise ValueError(f'{path} is not an OFF file')
+        # the counts can follow OFF on the same line
+        counts = words[1:] or _header_line(f).split()
+        n_vertices, n_faces = int(counts[0]), int(counts[1])
+        xyz = _parse_lines(f, n_vertices, np.float64)[:, :3]
+        faces = _split_faces(_parse_lines(f, n_faces, np.int64))
+    return np.ascontiguousarray(xyz).reshape(-1, 3), faces
+
+
+def read_ply(path: str) -> Tuple[ndarray, ndarray]:
+    """
+    Reads a mesh from an ASCII or binary PLY file.  Only x, y, z of the vertices and the vertex
+    indices of the faces are kept, other properties and elements are skipped.
+
+    :param path: The file to read.
+    :return: (N, 3) float64 vertex coordinates and (F, k) int32 faces
+    """
+    with open(path, 'rb') as f:
+        if f.readline().strip() != b'ply':
+            raise ValueError(f'{path} is not a PLY file')
+        form = None
+        elements: List[Tuple[str, int, List[Tuple]]] = []
+        while True:
+            words = f.readline().decode('ascii').split()
+            if not words:
+                continue
+            if words[0] == 'end_header':
+                break
+            if words[0] == 'format':
+                form = words[1]
+            elif words[0] == 'element':
+                elements.append((words[1], int(words[2]), []))
+            elif words[0] == 'property':
+                if words[1] == 'list':
+                    elements[-1][2].append((words[4], _PLY_TYPES[words[2]], _PLY_TYPES[words[3]]))
+                else:
+                    elements[-1][2].append((words[2], _PLY_TYPES[words[1]], None))
+        if form == 'ascii':
+            return _read_ply_ascii(f, elements)
+        if form in ('binary_little_endian', 'binary_big_endian'):
+            return _read_ply_binary(f, elements, '<' if form == 'binary_little_endian' else '>')
+        raise ValueError(f'unknown PLY format: {form}')
+
+
+def _ply_xyz(names: List[str], values: ndarray) -> ndarray:
+    return np.stack([values[:, names.index(axis)] for axis in 'xyz'], axis=1).astype(np.float64)
+
+
+def _read_ply_ascii(f: IO, elements) -> Tuple[ndarray, ndarray]:
+    text = io.TextIOWrapper(f, encoding='ascii')
+    xyz = np.empty((0, 3))
+    faces = np.empty((0, 3), dtype=np.int32)
+    for name, count, properties in elements:
+        if name == 'vertex':
+            xyz = _ply_xyz([p[0] for p in properties], _parse_lines(text, count, np.float64))
+        elif name == 'face':
+            if len(properties) != 1:
+                raise ValueError('only faces with just a list of vertex indices are supported')
+            faces = _split_faces(_parse_lines(text, count, np.int64))
+        else:
+            for _ in range(count):
+                text.readline()
+    return xyz, faces
+
+
+def _read_ply_binary(f: IO, elements, order: str) -> Tuple[ndarray, ndarray]:
+    xyz = np.empty((0, 3))
+    faces = np.empty((0, 3), dtype=np.int32)
+    for name, count, properties in elements:
+        lists = [p for p in properties if p[2] is not None]
+        if not lists:
+            dtype = np.dtype([(p[0], order + p[1]) for p in properties])
+            records = np.fromfile(f, dtype=dtype, count=count)
+            if name == 'vertex':
+                xyz = np.stack([records[axis] for axis in 'xyz'], axis=1).astype(np.float64)
+            continue
+        if name != 'face' or len(properties) != 1:
+            raise ValueError(f'unsupported PLY element: {name}')
+        _, count_type, index_type = properties[0]
+        if count == 0:
+            continue
+        # every face is expected to have as many vertices as the first one
+        start = f.tell()
+        k = int(np.fromfile(f, dtype=order + count_type, count=1)[0])
+        f.seek(start)
+        dtype = np.dtype([('n', order + count_type), ('v', order + index_type, (k,))])
+        chunks = []
+        for begin in range(0, count, _CHUNK_ROWS):
+            records = np.fromfile(f, dtype=dtype, count=min(_CHUNK_ROWS, count - begin))
+            if np.any(records['n'] != k):
+                raise ValueError('only faces with the same number of vertices are supported')
+            chunks.append(records['v'].astype(np.int32))
+        faces = np.concatenate(chunks)
+    return xyz, faces
+
+
+def read(path: str) -> Tuple[ndarray, ndarray]:
+    """
+    Reads a mesh from an OFF or PLY file, by its extension.
+
+    :param path: The file to read.
+    :return: (N, 3) float64 vertex coordinates and (F, k) int32 faces
+    """
+    if path.lower().endswith('.off'):
+        return read_off(path)
+    if path.lower().endswith('.ply'):
+        return read_ply(path)
+    raise ValueError(f'unknown mesh file type: {path}')
@@ -1,10 +1,13 @@
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 from numpy import ndarray
 
-from vk2gpz.geom.vertex import Vertex
+from vk2gpz.geom import graph
+from vk2gpz.geom.fields import FieldStore
+from vk2gpz.geom.io import formats
+from vk2gpz.geom.vertex import Vertex, VertexBuffers
 
 
 class IManifold:
@@ -13,7 +16,28 @@ class IManifold:
 
 class Manifold(IManifold, metaclass=ABCMeta):
     def __init__(self):
-        pass
+        # incremented whenever the vertices or the faces change, so that caches kept outside
+        # of the manifold can tell they are stale
+        self.topology_version: int = 0
+        self._buffers: VertexBuffers = None
+        self._face_indices: ndarray = None
+        self._face_fields: FieldStore = None
+        self._adjacency: Tuple[ndarray, ndarray] = None
+        self._neighbour_table: ndarray = None
+        self._ring_search: graph.RingSearch = None
+
+    def _invalidate(self) -> None:
+        """
+        Drops everything derived from the current vertices and faces.
+        """
+        self.topology_version += 1
+        self._face_indices = None
+        # the rows of the face fields no longer match the faces.  The vertex fields go with the
+        # vertex buffers, which are replaced whenever the vertices change.
+        self._face_fields = None
+        self._adjacency = None
+        self._neighbour_table = None
+        self._ring_search = None
 
     @abstractmethod
     def get_all_vertices(self) -> List[Vertex]:
@@ -27,6 +51,24 @@ class Manifold(IManifold, metaclass=ABCMeta):
     def get_faces(self) -> List[Vertex]:
         raise NotImplemented()
 
+    def face_indices(self) -> ndarray:
+        """
+        Returns the vertex IDs of all the faces in get_faces() order, one row per face.
+        It is built once and kept until the topology changes, and must not be modified.
+
+        :return: (F, vertices per face) int32 array
+        """
+        if self._face_indices is None:
+            faces = np.asarray(self._build_face_indices(), dtype=np.int32)
+            faces = faces.reshape(-1, self.get_number_of_vertices_per_face())
+            faces.flags.writeable = False
+            self._face_indices = faces
+        return self._face_indices
+
+    @abstractmethod
+    def _build_face_indices(self) -> ndarray:
+        raise NotImplemented()
+
     @abstractmethod
     def get_number_of_vertices_per_face(self) -> int:
         raise NotImplemented()
@@ -34,21 +76,101 @@ class Manifold(IManifold, metaclass=ABCMeta):
     def get_neighbours_in_distance(self, v: Vertex, dis: int) -> List[List[Vertex]]:
         """
         Returns 2D array containing neighbours at different levels.
+        The visited flags are neither used nor changed, there is no need to unmark the vertices first.
+
         :param v:
         :param dis:
         :return:
         """
-        n1: List[Vertex] = self.get_neighbours(v, False)
-        neighbours: List[List[Vertex]] = [n1]
-        level: int = dis - 1
-        for i in range(level):
-            n1: List[Vertex] = []
-            for vTmp in neighbours[i]:
-                n = self.get_neighbours(vTmp, False)
-                n1.extend(n)
-            neighbours.append(n1)
+        return [[self.get_vertex_by_id(i) for i in ring] for ring in self.k_ring(v, dis)]
 
-        return neighbours
+    def k_ring(self, v: Union[Vertex, int], k: int) -> List[ndarray]:
+        """
+        Returns the IDs of the vertices at the distance 1, 2, ..., k from a vertex.
+        The search keeps its state to itself, so it can run from several threads at once.
+
+        :param v: The vertex, or its ID.
+        :param k: The number of rings.
+        :return: A list of k arrays of vertex IDs.
+        """
+        if self._ring_search is None:
+            self._ring_search = graph.RingSearch(*self.adjacency())
+        seed = v if isinstance(v, (int, np.integer)) else self.get_vertex_id(v)
+        return self._ring_search.rings(seed, k)
+
+    def k_rings(self, seed_ids: ndarray, k: int, chunk_size: int = None) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Returns the vertices within the distance k of many vertices in one call.
+
+        :param seed_ids: The IDs of the vertices to search from.
+        :param k: The number of rings.
+        :param chunk_size: The number of seeds searched together, None for all of them.
+               Smaller chunks keep the memory bounded.
+        :return: (ids, offsets, levels): the neighbourhood of seed_ids[i] is ids[offsets[i]:offsets[i + 1]],
+                 and levels holds the ring each entry of ids belongs to.
+        """
+        return graph.k_rings(*self.adjacency(), seed_ids, k, chunk_size)
+
+    @abstractmethod
+    def get_vertex_id(self, v: Vertex) -> int:
+        """
+        Returns the ID of a vertex in adjacency().
+
+        :param v: The vertex.
+        :return: The vertex ID.
+        """
+        raise NotImplemented()
+
+    @abstractmethod
+    def get_vertex_by_id(self, i: int) -> Vertex:
+        """
+        Returns the vertex of an ID in adjacency().
+
+        :param i: The vertex ID.
+        :return: The vertex.
+        """
+        raise NotImplemented()
+
+    @abstractmethod
+    def adjacency(self) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the neighbours of all the vertices in CSR form, the neighbours of the vertex i are
+        indices[indptr[i]:indptr[i + 1]].  It is built once and must not be modified.
+
+        :return: indptr and indices int32 arrays
+        """
+        raise NotImplemented()
+
+    def neighbour_table(self) -> ndarray:
+        """
+        Returns the neighbours of all the vertices as a (N, max neighbours) array.
+        Vertices with fewer neighbours are padded with -1.
+
+        :return: (N, max neighbours) int32 array
+        """
+        if self._neighbour_table is None:
+            indptr, indices = self.adjacency()
+            degree = np.diff(indptr)
+            rows = np.repeat(np.arange(len(degree)), degree)
+            cols = np.arange(len(indices)) - np.repeat(indptr[:-1], degree)
+            table = np.full((len(degree), int(degree.max())), -1, dtype=np.int32)
+            table[rows, cols] = indices
+            table.flags.writeable = False
+            self._neighbour_table = table
+        return self._neighbour_table
+
+    def neighbours(self, ids):
+        """
+        Looks up the immediate neighbours of vertices in the precomputed adjacency.
+
+        :param ids: A vertex ID, or an array of them.
+        :return: The neighbour IDs of the vertex as a slice of the adjacency,
+                 or a neighbour_table() row per ID for an array of IDs.
+        """
+        if np.ndim(ids) == 0:
+            indptr, indices = self.adjacency()
+            return indices[indptr[ids]:indptr[ids + 1]]
+        return self.neighbour_table()[ids]
 
     @abstractmethod
     def get_vertex_at(self, x, y) -> Vertex:
@@ -82,13 +204,120 @@ class Manifold(IManifold, metaclass=ABCMeta):
             pv.visited = False
 
     def get_all_xyz(self) -> ndarray:
-        xyz = []
-        for v in self.get_all_vertices():
-            xyz.append(v.coord)
-        return np.array(xyz)
+        """
+        Returns the coordinates of all the vertices in get_all_vertices() order.
+        The coord of every vertex is a view into its row, so this is the buffer itself, not a copy:
+        writing to it moves the vertices.
+
+        :return: (N, 3) float64 array
+        """
+        return self._vertex_buffers().xyz
+
+    @property
+    def fields(self) -> FieldStore:
+        """
+        The per-vertex fields, one row per vertex in get_all_vertices() order.
+        Vertex.data and Vertex.color read and write the 'data' and 'color' fields when there are such fields.
+        They are dropped when the topology changes.
+        """
+        return self._vertex_buffers().fields
+
+    @property
+    def face_fields(self) -> FieldStore:
+        """
+        The per-face fields, one row per face in face_indices() order.
+        They are dropped when the topology changes.
+        """
+        if self._face_fields is None:
+            self._face_fields = FieldStore(len(self.face_indices()))
+        return self._face_fields
+
+    @property
+    def grid_xy(self) -> ndarray:
+        """
+        (N, 2) (x, y) locations of all the vertices in get_all_vertices() order.
+        """
+        return np.array([[v.x, v.y] for v in self.get_all_vertices()], dtype=np.int32).reshape(-1, 2)
+
+    def export(self, path: str, format: str = 'off', coords='xyz') -> None:
+        """
+        Writes the manifold into a mesh file, streaming it from the coordinate and face arrays.
+
+        :param path: The file to write.
+        :param format: 'off', 'ply', 'ply-binary' or 'obj'.
+        :param coords: 'xyz' for the vertex coordinates, 'grid' for the (x, y) grid locations,
+               or a Projection for the projected coordinates.  The 2D ones are written with z = 0.
+        :return: None
+        """
+        if isinstance(coords, str) and coords == 'xyz':
+            xyz = self.get_all_xyz()
+        else:
+            if isinstance(coords, str) and coords == 'grid':
+                xy = self.grid_xy
+            elif hasattr(coords, 'project'):
+                xy = coords.project(self.get_all_xyz())
+            else:
+                raise ValueError(f'unknown coords: {coords}')
+            xyz = np.zeros((len(xy), 3))
+            xyz[:, :2] = xy
+        formats.export(path, xyz, self.face_indices(), format)
+
+    def get_all_latlon(self) -> ndarray:
+        """
+        Returns the spherical coordinates of all the vertices in get_all_vertices() order,
+        computed from get_all_xyz() on first use.
+
+        :return: (N, 2) float64 array
+        """
+        return self._vertex_buffers().latlon
+
+    def get_all_projected(self) -> ndarray:
+        """
+        Returns the 2D projected coordinates of all the vertices in get_all_vertices() order.
+
+        :return: (N, 2) float64 array, or None if nothing has been projected yet
+        """
+        return self._vertex_buffers().projected
+
+    def set_all_projected(self, projected: ndarray) -> None:
+        """
+        Stores the 2D projected coordinates of all the vertices, in get_all_vertices() order.
+
+        :param projected: (N, 2) array
+        :return: None
+        """
+        self._vertex_buffers().projected = np.asarray(projected, dtype=np.float64).reshape(-1, 2)
+
+    def _cache_arrays(self) -> Dict[str, ndarray]:
+        """
+        Returns the arrays a MeshCache stores to rebuild this manifold without recomputing them.
+        """
+        indptr, indices = self.adjacency()
+        return {'xyz': self.get_all_xyz(), 'faces': self.face_indices(), 'indptr': indptr, 'indices': indices}
+
+    def _restore_cache_arrays(self, arrays: Dict[str, ndarray]) -> None:
+        """
+        Takes over the arrays _cache_arrays() returned, loaded back from a MeshCache.
+        """
+        self._face_indices = arrays['faces']
+        self._adjacency = (arrays['indptr'], arrays['indices'])
+
+    def _vertex_buffers(self) -> VertexBuffers:
+        """
+        Returns the per-vertex buffers.  If there are none yet, the coordinates are gathered from
+        the vertices and the vertices are bound to the new buffer.
+        """
+        if self._buffers is None:
+            vertices = self.get_all_vertices()
+            xyz = np.array([v.coord for v in vertices], dtype=np.float64).reshape(-1, 3)
+            self._buffers = VertexBuffers(xyz)
+            for i, v in enumerate(vertices):
+                v.bind(self._buffers, i)
+        return self._buffers
 
     def get_all_triangles(self) -> ndarray:
-        xyz = []
-        for v in self.get_faces():
-            xyz.append(v.id)
-        return np.array(xyz)
+        """
+        Returns the vertex IDs of all the faces one after another, in a new int64 array the caller may
+        modify.  face_indices() gives the same IDs without a copy.
+        """
+        return self.face_indices().ravel().astype(np.int64)
@@ -18,22 +18,30 @@ class Projection(IProjection, metaclass=ABCMeta):
     def xyz_to_2d(self, coord: array) -> array:
         return self._latlong_to_2d(util.xyz_to_latlong(coord))
 
+    def project(self, xyz: ndarray) -> ndarray:
+        """
+        Projects many points at once.  _latlong_to_2d() works element by element,
+        so it is given the latitudes and the longitudes of all the points as two rows.
+
+        :param xyz: (N, 3) coordinates
+        :return: (N, 2) projected coordinates
+        """
+        xyz = numpy.asarray(xyz, dtype=numpy.float64)
+        return self._latlong_to_2d(util.xyz_to_latlong(xyz.T)).T
+
     def build(self, dome) -> ndarray:
-        triangles = dome.get_faces()
-        ver_per_face = dome.get_number_of_vertices_per_face()
-
-        for v in dome.get_all_vertices():
-            v.projected_coord = self.xyz_to_2d(v.coord)
-
-        tmp2Dtri = []
-        for i in range(len(triangles)):
-            if i % ver_per_face == 0:
-                # check the triangle is facing you or not.
-                p1 = triangles[i].projected_coord
-                p2 = triangles[i + 1].projected_coord
-                p3 = triangles[i + 2].projected_coord
-                if util.facing(p1, p2, p3):
-                    tmp2Dtri.append([triangles[i + 0].id, triangles[i + 1].id, triangles[i + 2].id])
-
-        return numpy.array(tmp2Dtri)
+        """
+        Projects all the vertices of a dome into its projected buffer and picks the triangles
+        facing you in the projection.
+
+        :param dome: The dome.
+        :return: (F, 3) vertex IDs of the visible triangles
+        """
+        projected = self.project(dome.get_all_xyz())
+        dome.set_all_projected(projected)
+
+        # check which triangles are facing you, all at once
+        triangles = dome.face_indices()
+        p = projected[triangles]
+        return triangles[util.facing(p[:, 0], p[:, 1], p[:, 2])]
 
@@ -0,0 +1,203 @@
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+from vk2gpz.geom.grid.plane import Lattice, Plane, Topology
+from vk2gpz.geom.manifold import Manifold
+
+# rule(state, neighbours, degree, out) writes the next state into out.  neighbours holds the values of
+# the neighbours of every vertex, (N, k) or (N, k, c), padded with the fill value of the engine where a
+# vertex has fewer than k neighbours; degree is the number of real neighbours, shaped to broadcast
+# against state.  The order of the neighbours of a vertex is not specified.  A rule that needs a state of
+# at least some type, such as floating point, gives it as rule.dtype and the engine promotes the state to it.
+Rule = Callable[[ndarray, ndarray, ndarray, ndarray], None]
+
+
+def life(birth: Iterable[int] = (3,), survive: Iterable[int] = (2, 3)) -> Rule:
+    """
+    Returns a Game of Life-like rule on 0/1 states.  A dead vertex comes alive with a number of live
+    neighbours in birth, a live one stays alive with a number of live neighbours in survive.
+
+    :param birth: The numbers of live neighbours that bring a dead vertex to life.
+    :param survive: The numbers of live neighbours that keep a live vertex alive.
+    :return: The rule.
+    """
+    birth = list(birth)
+    survive = list(survive)
+
+    def rule(state: ndarray, neighbours: ndarray, degree: ndarray, out: ndarray) -> None:
+        alive = np.count_nonzero(neighbours, axis=1)
+        born = np.zeros(neighbours.shape[1] + 1, dtype=bool)
+        born[birth] = True
+        kept = np.zeros(neighbours.shape[1] + 1, dtype=bool)
+        kept[survive] = True
+        np.copyto(out, np.where(state != 0, kept[alive], born[alive]), casting='unsafe')
+
+    return rule
+
+
+def diffusion(rate: float) -> Rule:
+    """
+    Returns an explicit diffusion rule: every vertex moves towards the mean of its neighbours,
+    state + rate * (mean - state).  The engine must be created with fill=0.  An integer state is
+    stepped as float64.
+
+    :param rate: The fraction of the difference to the mean taken per step, 0 to 1.
+    :return: The rule.
+    """
+
+    def rule(state: ndarray, neighbours: ndarray, degree: ndarray, out: ndarray) -> None:
+        np.sum(neighbours, axis=1, out=out)
+        out /= np.maximum(degree, 1)
+        out -= state
+        out *= rate
+        out += state
+
+    rule.dtype = np.float64
+    return rule
+
+
+def _runs(length: int, start: int, step: int, shift: int, wrap: bool) -> List[Tuple[slice, slice]]:
+    """
+    Splits the indices start, start + step, ... below length into slices whose indices moved by shift
+    are in range, as (destination, source) pairs.  The source of an index moved off an end is wrapped
+    around, or None if wrap is False.  shift is -1, 0 or 1.
+    """
+    indices = range(start, length, step)
+    if not indices:
+        return []
+    lo, hi = indices[0], indices[-1]
+    edges = []
+    if lo + shift < 0:
+        edges.append(lo)
+        lo += step
+    elif hi + shift >= length:
+        edges.append(hi)
+        hi -= step
+    runs = []
+    if lo <= hi:
+        runs.append((slice(lo, hi + 1, step), slice(lo + shift, hi + shift + 1, step)))
+    for i in edges:
+        source = (i + shift) % length
+        runs.append((slice(i, i + 1), slice(source, source + 1) if wrap else None))
+    return runs
+
+
+class StencilEngine:
+    """
+    Steps a rule over the per-vertex state of a manifold, all the vertices at once.
+
+    The neighbour values are gathered into one preallocated array per step.  On a Plane they are
+    copied with shifted slices of the (y, x) grid, the hexagonal offsets chosen by row parity and
+    the Donut wrapping around, so no index array is needed.  On other manifolds they are taken
+    through neighbour_table(), where the pentagons of a GeodesicDome have 5 neighbours.
+    The state is double-buffered: steps write into two arrays the engine keeps.
+
+        engine = StencilEngine(plane, life(birth=(2,), survive=(3, 4)))
+        state = engine.step(state, 10)
+
+    The state of a GeodesicDome has one row per canonical vertex, use state[dome.canonical_ids]
+    for one row per vertex.
+    """
+
+    def __init__(self, manifold: Manifold, rule: Rule, fill=0):
+        """
+        :param manifold: The manifold.
+        :param rule: Computes the next state, see Rule.
+        :param fill: The value of the missing neighbours.
+        """
+        self.manifold = manifold
+        self.rule = rule
+        self.fill = fill
+        self._buffers: List[ndarray] = None
+        self._neighbours: ndarray = None
+        # a Donut narrower than 3 has repeated neighbours, which neighbour_table() drops
+        self._shifts = isinstance(manifold, Plane) and \
+            not (manifold.topology == Topology.Donut and (manifold.x < 3 or manifold.y < 3))
+        if self._shifts:
+            self._copies = self._plane_copies(manifold)
+            self.size = manifold.x * manifold.y
+            self.width = len(manifold._neighbour_offsets()[1])
+            degree = np.full((manifold.y, manifold.x), self.width, dtype=np.int32)
+            for dst, k, src in self._copies:
+                if src is None:
+                    degree[dst] -= 1
+            self.degree = degree.reshape(-1)
+        else:
+            table = manifold.neighbour_table()
+            self.size, self.width = table.shape
+            missing = table < 0
+            self._table = np.where(missing, 0, table)
+            self._missing = np.nonzero(missing)
+            self.degree = (self.width - np.count_nonzero(missing, axis=1)).astype(np.int32)
+
+    @staticmethod
+    def _plane_copies(plane: Plane) -> List[Tuple[Tuple[slice, slice], int, Tuple[slice, slice]]]:
+        """
+        Returns the copies that gather the neighbours of a plane as (destination rows and columns,
+        neighbour number, source rows and columns or None for the fill value).
+        """
+        dx, dy = plane._neighbour_offsets()
+        wrap = plane.topology == Topology.Donut
+        # the hexagonal offsets differ between even and odd rows
+        parities = [(0, 2), (1, 2)] if plane.lattice == Lattice.Hexagonal else [(0, 1)]
+        copies = []
+        for k in range(len(dy)):
+            for start, step in parities:
+                for dst_rows, src_rows in _runs(plane.y, start, step, int(dy[k]), wrap):
+                    for dst_cols, src_cols in _runs(plane.x, 0, 1, int(dx[start][k]), wrap):
+                        src = None if src_rows is None or src_cols is None else (src_rows, src_cols)
+                        copies.append(((dst_rows, dst_cols), k, src))
+        return copies
+
+    def gather(self, state: ndarray, out: ndarray = None) -> ndarray:
+        """
+        Collects the values of the neighbours of every vertex.
+
+        :param state: (N,) or (N, c) values.
+        :param out: (N, k) or (N, k, c) array to write into, a new one if None.
+        :return: The neighbour values, the fill value where there is no neighbour.
+        """
+        if out is None:
+            out = np.empty((self.size, self.width) + state.shape[1:], dtype=state.dtype)
+        if self._shifts:
+            grid = state.reshape((self.manifold.y, self.manifold.x) + state.shape[1:])
+            gathered = out.reshape((self.manifold.y, self.manifold.x) + out.shape[1:])
+            for dst, k, src in self._copies:
+                gathered[dst + (k,)] = self.fill if src is None else grid[src]
+        else:
+            np.take(state, self._table, axis=0, out=out)
+            out[self._missing] = self.fill
+        return out
+
+    def step(self, state: ndarray, n: int = 1) -> ndarray:
+        """
+        Applies the rule n times.
+
+        :param state: (N,) or (N, c) values of the vertices.  It is not modified.
+        :param n: The number of steps.
+        :return: The state after n steps, in a buffer of the engine that the next call to step() reuses.
+                 Its type is that of state, promoted to the dtype of the rule if it has one.
+        """
+        state = np.asarray(state)
+        dtype = getattr(self.rule, 'dtype', None)
+        if dtype is not None:
+            state = state.astype(np.promote_types(state.dtype, dtype), copy=False)
+        if len(state) != self.size:
+            raise ValueError(f'the state has {len(state)} rows for {self.size} vertices')
+        if self._buffers is None or self._buffers[0].shape != state.shape or self._buffers[0].dtype != state.dtype:
+            self._buffers = [np.empty_like(state), np.empty_like(state)]
+            self._neighbours = np.empty((self.size, self.width) + state.shape[1:], dtype=state.dtype)
+        current, following = self._buffers
+        if state is following:
+            # the result of the previous call, carry on from it without a copy
+            current, following = following, current
+        else:
+            np.copyto(current, state)
+        degree = self.degree.reshape((-1,) + (1,) * (state.ndim - 1))
+        for _ in range(n):
+            self.rule(current, self.gather(current, self._neighbours), degree, following)
+            current, following = following, current
+        self._buffers = [following, current]
+        return current
@@ -27,18 +27,54 @@ def angle(a: array, b: array) -> (float, float):
 
 
 def facing(p1: array, p2: array, p3: array) -> bool: # List[GeodesicVertex], index: int) -> bool:
+    """
+    Tests whether 2D triangles are counter-clockwise, i.e. facing you.
+    The points can be single (2,) points or (N, 2) arrays of them, for N triangles at once.
+
+    :param p1: 1st points
+    :param p2: 2nd points
+    :param p3: 3rd points
+    :return: True for the triangles facing you, a bool array for arrays of points
+    """
     v1 = p2 - p1
     v2 = p3 - p2
-    v3 = np.cross(v1, v2)
+    # the z component of the cross product of the two edges
+    v3 = v1[..., 0] * v2[..., 1] - v1[..., 1] * v2[..., 0]
     return v3 > 0
 
 
+def normalize(coords: array) -> array:
+    """
+    Scales each row of an (N, 3) array to unit length.
+
+    The row norms are taken with the same dot kernel np.linalg.norm uses for a single vector,
+    so the result is bit for bit what normalising the rows one by one would give.
+
+    :param coords: (N, 3) array of vectors
+    :return: (N, 3) array of unit vectors
+    """
+    norms = np.sqrt(np.matmul(coords[:, np.newaxis, :], coords[:, :, np.newaxis]))
+    return coords / norms[:, :, 0]
+
+
 def xyz_to_latlong(coord: array) -> array:
     lat = np.arcsin(coord[2])
     lon = np.arctan2(coord[1], coord[0])
     return np.array([lat, lon])
 
 
+def latlong_to_xyz(latlon: array) -> array:
+    """
+    The inverse of xyz_to_latlong(), for one or many points.
+
+    :param latlon: (..., 2) latitudes and longitudes in radian
+    :return: (..., 3) coordinates on the unit sphere
+    """
+    lat = latlon[..., 0]
+    lon = latlon[..., 1]
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
 def spherical_to_xyz(latitude, longitude) -> array:
     y = np.cos(latitude)
     x = np.sin(latitude) * np.sin(longitude)
@@ -47,7 +83,7 @@ def spherical_to_xyz(latitude, longitude) -> array:
 
 
 def xyz_to_spherical(coord: array) -> array:
-    latlong: array = np.array([0, 0])
+    latlong: array = np.array([0.0, 0.0])
     if coord[1] > 0.9999:
         latlong = np.array([0, 0])
     elif coord[1] < -0.9999:
@@ -61,6 +97,24 @@ def xyz_to_spherical(coord: array) -> array:
     return latlong
 
 
+def xyz_to_spherical_all(xyz: array) -> array:
+    """
+    xyz_to_spherical() for many coordinates at once.
+
+    :param xyz: (N, 3) coordinates
+    :return: (N, 2) spherical coordinates
+    """
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lat = np.arccos(np.clip(y / np.sqrt(x * x + y * y + z * z), -1.0, 1.0))
+        lon = np.arccos(np.clip(z / np.sqrt(x * x + z * z), -1.0, 1.0))
+    lon = np.where(x < 0, _2pi - lon, lon)
+    lat[y > 0.9999] = 0
+    lat[y < -0.9999] = np.pi
+    lon[np.abs(y) > 0.9999] = 0
+    return np.stack([lat, lon], axis=1)
+
+
 def rotation_matrix(axis: np.ndarray, theta: float) -> np.ndarray:
     mat = np.eye(3, 3)
     axis = axis / np.sqrt(np.dot(axis, axis))
@@ -3,20 +3,151 @@ from abc import ABCMeta
 import numpy as np
 from numpy import ndarray
 
+from vk2gpz.geom import util
+from vk2gpz.geom.fields import FieldStore
+
+
 class IManifold:
     pass
 
+
+# returned by VertexBuffers.field_row() when there is no such field, since None can be a value
+_NO_FIELD = object()
+
+
+class VertexBuffers:
+    """
+    The per-vertex arrays of a manifold, one row per vertex in get_all_vertices() order.
+    The vertices bound to it read and write their coordinates as views into these rows.
+    """
+
+    def __init__(self, xyz: ndarray):
+        self.xyz: ndarray = xyz
+        self._latlon: ndarray = None
+        self.projected: ndarray = None
+        self._fields: FieldStore = None
+
+    @property
+    def latlon(self) -> ndarray:
+        """
+        (N, 2) spherical coordinates of the vertices as given by util.xyz_to_spherical(), computed on first use.
+        """
+        if self._latlon is None:
+            self._latlon = util.xyz_to_spherical_all(self.xyz)
+        return self._latlon
+
+    @property
+    def fields(self) -> FieldStore:
+        """
+        The named per-vertex fields, created on first use.
+        """
+        if self._fields is None:
+            self._fields = FieldStore(len(self.xyz))
+        return self._fields
+
+    def field_row(self, name: str, row: int):
+        """
+        Returns the row of a field, or _NO_FIELD if there is no such field.
+        """
+        if self._fields is None or name not in self._fields:
+            return _NO_FIELD
+        return self._fields[name][row]
+
+    def set_field_row(self, name: str, row: int, value) -> bool:
+        """
+        Sets the row of a field, if there is such a field.
+
+        :return: False if there is no such field.
+        """
+        if self._fields is None or name not in self._fields:
+            return False
+        self._fields[name][row] = value
+        return True
+
+
 class Vertex(metaclass=ABCMeta):
+    # no per-instance __dict__, a vertex of a large mesh costs only its slots
+    __slots__ = ('visited', 'x', 'y', 'manifold', '_data', '_color', 'id', '_buffers', '_row', '_coord')
 
     def __init__(self, x: int, y: int):
         self.visited: bool = False
         self.x: int = x
         self.y: int = y
-        self.manifold: IManifold
-        self.data = None
-        self.color = None
+        self.manifold: IManifold = None
+        self._data = None
+        self._color = None
         self.id: int = -1
-        self.coord: ndarray = np.array([0.0, 0.0, 0.0])
+        self._buffers: VertexBuffers = None
+        self._row: int = -1
+        self._coord: ndarray = None
+
+    @property
+    def coord(self) -> ndarray:
+        if self._buffers is None:
+            if self._coord is None:
+                self._coord = self._initial_coord()
+            return self._coord
+        return self._buffers.xyz[self._row]
+
+    @coord.setter
+    def coord(self, coord: ndarray) -> None:
+        if self._buffers is None:
+            self._coord = coord
+        else:
+            self._buffers.xyz[self._row] = coord
+
+    @property
+    def data(self):
+        """
+        The 'data' field of the manifold at this vertex if the manifold has one,
+        otherwise any object set on the vertex itself.
+        """
+        if self._buffers is not None:
+            value = self._buffers.field_row('data', self._row)
+            if value is not _NO_FIELD:
+                return value
+        return self._data
+
+    @data.setter
+    def data(self, data) -> None:
+        if self._buffers is None or not self._buffers.set_field_row('data', self._row, data):
+            self._data = data
+
+    @property
+    def color(self):
+        """
+        The 'color' field of the manifold at this vertex if the manifold has one,
+        otherwise any object set on the vertex itself.
+        """
+        if self._buffers is not None:
+            value = self._buffers.field_row('color', self._row)
+            if value is not _NO_FIELD:
+                return value
+        return self._color
+
+    @color.setter
+    def color(self, color) -> None:
+        if self._buffers is None or not self._buffers.set_field_row('color', self._row, color):
+            self._color = color
+
+    def _initial_coord(self) -> ndarray:
+        """
+        Returns the coordinates of an unbound vertex that has not been given any.
+        """
+        return np.array([0.0, 0.0, 0.0])
+
+    def bind(self, buffers: VertexBuffers, row: int) -> None:
+        """
+        Moves the coordinates of the vertex to a row of the manifold's buffers.
+        From then on coord is a view into that row.
+
+        :param buffers: The buffers of the manifold.
+        :param row: The row of the vertex.
+        :return: None
+        """
+        self._buffers = buffers
+        self._row = row
+        self._coord = None
 
     def get_neighbours_in_distance(self, src_vertex, distance):
         if self.manifold is not None:
@@ -24,4 +155,4 @@ class Vertex(metaclass=ABCMeta):
         return None
 
     def set_data(self, data):
-        self.data = data
\ No newline at end of file
+        self.data = data
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+
+
+def _object_dome(frequency: int) -> GeodesicDome:
+    dome = GeodesicDome()
+    if frequency > 1:
+        dome.split(frequency)
+    return dome
+
+
+@pytest.mark.parametrize('frequency', [1, 2, 3, 5, 8])
+def test_from_frequency_matches_object_dome(frequency):
+    expected = _object_dome(frequency)
+    dome = GeodesicDome.from_frequency(frequency)
+
+    vertices = expected.get_all_vertices()
+    assert dome.get_number_of_vertices() == len(vertices)
+    assert np.array_equal(dome.xyz, np.array([v.coord for v in vertices]))
+    assert np.array_equal(dome.grid_xy, np.array([[v.x, v.y] for v in vertices]))
+    faces = np.array([v.id for v in expected.get_faces()]).reshape(-1, 3)
+    assert np.array_equal(dome.faces, faces)
+
+
+def test_array_dome_split_matches_object_dome():
+    expected = _object_dome(2)
+    expected.split(3)
+    dome = GeodesicDome.from_frequency(2)
+    dome.split(3)
+    assert dome.frequency == expected.frequency == 6
+    assert np.array_equal(dome.xyz, expected.xyz)
+
+
+def test_array_dome_neighbours():
+    expected = _object_dome(4)
+    dome = GeodesicDome.from_frequency(4)
+    for x, y in [(0, 0), (0, 4), (3, 2), (8, 4), (24, 20)]:
+        expected.unmark_vertices()
+        dome.unmark_vertices()
+        v1 = expected.get_neighbours(expected.get_vertex_at(x, y), False)
+        v2 = dome.get_neighbours(dome.get_vertex_at(x, y), False)
+        assert [(v.x, v.y) for v in v1] == [(v.x, v.y) for v in v2]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        GeodesicDome.from_frequency(2, backend='numpy')
+
+
+@pytest.mark.parametrize('frequency', [2, 3, 4])
+def test_adjacency_matches_get_neighbours(frequency):
+    dome = GeodesicDome.from_frequency(frequency)
+    indptr, indices = dome.adjacency()
+    assert len(indptr) == 10 * frequency * frequency + 3
+    assert np.count_nonzero(np.diff(indptr) == 5) == 12
+    for v in dome.get_all_vertices():
+        dome.unmark_vertices()
+        expected = sorted({dome.get_vertex_id(n) for n in dome.get_neighbours(v, False)})
+        assert list(dome.neighbours(dome.get_vertex_id(v))) == expected
+
+
+def test_neighbour_table():
+    dome = GeodesicDome.from_frequency(3)
+    table = dome.neighbours(np.arange(5))
+    assert table.shape == (5, 6)
+    for i in range(5):
+        row = table[i]
+        assert list(row[row >= 0]) == list(dome.neighbours(i))
+
+
+@pytest.mark.parametrize('frequency', [1, 2, 3, 7])
+def test_canonical_ids_match_same_vertices(frequency):
+    dome = GeodesicDome.from_frequency(frequency)
+    canonical = dome.canonical_ids
+    for i, v in enumerate(dome.get_all_vertices()):
+        for vSame in v.same_vertices or []:
+            assert canonical[dome.get_all_vertices().index(vSame)] == canonical[i]
+    assert canonical.max() + 1 == 10 * frequency * frequency + 2
+
+
+@pytest.mark.parametrize('frequency', [1, 4])
+def test_welded_arrays(frequency):
+    dome = GeodesicDome.from_frequency(frequency)
+    xyz = dome.welded_xyz
+    faces = dome.welded_faces
+    assert xyz.shape == (10 * frequency * frequency + 2, 3)
+    assert faces.shape == (20 * frequency * frequency, 3)
+    assert np.allclose(xyz[dome.canonical_ids], dome.xyz)
+    # a closed surface: every edge is shared by exactly two triangles
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    assert np.all(np.unique(edges, axis=0, return_counts=True)[1] == 2)
+
+
+def test_faces_cached_until_split():
+    dome = GeodesicDome.from_frequency(2)
+    version = dome.topology_version
+    faces = dome.face_indices()
+    assert faces.dtype == np.int32 and not faces.flags.writeable
+    assert dome.face_indices() is faces
+    assert dome.get_faces() is dome.get_faces()
+    assert dome.get_all_vertices() is dome.get_all_vertices()
+    triangles = dome.get_all_triangles()
+    assert np.array_equal(triangles, [v.id for v in dome.get_faces()])
+    # a copy of its own, as before face_indices() was cached
+    assert triangles.dtype == np.int64 and triangles.flags.writeable
+    triangles[0] = -1
+    assert faces[0, 0] == 0
+
+    dome.split(2)
+    assert dome.topology_version > version
+    assert dome.face_indices().shape == (20 * 4 * 4, 3)
+    assert len(dome.get_faces()) == 3 * 20 * 4 * 4
+    assert [v.id for v in dome.get_all_vertices()] == list(range(dome.get_number_of_vertices()))
+
+
+def test_parallel_split_is_identical(monkeypatch):
+    from vk2gpz.geom.grid import geodesicdome
+    # small chunks, so that every worker gets some
+    monkeypatch.setattr(geodesicdome, '_SPLIT_CHUNK', 64)
+    expected = GeodesicDome.from_frequency(3)
+    expected.split(7)
+    dome = GeodesicDome.from_frequency(3)
+    dome.split(7, workers=3)
+    assert dome.frequency == 21
+    assert dome.get_all_xyz().tobytes() == expected.get_all_xyz().tobytes()
+    assert np.array_equal(dome.faces, expected.faces)
+
+
+def test_split_reports_progress_and_prints_nothing(capsys):
+    for dome in [GeodesicDome(2), GeodesicDome.from_frequency(2)]:
+        calls = []
+        dome.split(3, progress=lambda done, total: calls.append((done, total)))
+        assert calls and calls[-1][0] == calls[-1][1]
+        assert [done for done, _ in calls] == list(range(1, len(calls) + 1))
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('frequency', [1, 4])
+def test_seam_slots_and_derived_same_vertices(frequency):
+    for dome in [GeodesicDome(frequency), GeodesicDome.from_frequency(frequency)]:
+        pairs, poles = dome._find_same_vertices()
+        assert pairs.dtype == np.int32 and poles.shape == (2, 5)
+        # every point on the sphere but the poles appears at most twice
+        assert len(pairs) == dome.get_number_of_vertices() - (10 * frequency ** 2 + 2) - 8
+        assert np.allclose(dome.xyz[pairs[:, 0]], dome.xyz[pairs[:, 1]])
+        vertices = dome.get_all_vertices()
+        for a, b in pairs[:5]:
+            assert vertices[a].same_vertices == [vertices[b]]
+        top = [vertices[i] for i in poles[0]]
+        assert top[0].same_vertices == top[1:]
+        assert sum(v.same_vertices is None for v in vertices) == len(vertices) - 2 * len(pairs) - 10
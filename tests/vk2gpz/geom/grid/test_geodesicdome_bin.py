@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, 3)), rng.random((n, 2))
+
+
+@pytest.mark.parametrize('reducer', ['sum', 'mean', 'count', 'max'])
+def test_bin_matches_brute_force(reducer):
+    dome = GeodesicDome.from_frequency(3)
+    points, values = _points(5000)
+    vertex_id, triangle_id, _ = dome.locate(points)
+    for on, ids, n in [('vertex', vertex_id, len(dome.welded_xyz)), ('face', triangle_id, len(dome.faces))]:
+        result = dome.bin(points, values[:, 0], reducer=reducer, on=on, chunk_size=700)
+        assert result.shape == (n,)
+        for i in range(n):
+            selected = values[ids == i, 0]
+            if reducer == 'count':
+                assert result[i] == len(selected)
+            elif len(selected) == 0:
+                assert (result[i] == 0) if reducer == 'sum' else np.isnan(result[i])
+            else:
+                expected = {'sum': np.sum, 'mean': np.mean, 'max': np.max}[reducer](selected)
+                assert np.isclose(result[i], expected)
+
+
+def test_vertex_bins_are_voronoi_cells():
+    twice_split = GeodesicDome.from_frequency(2)
+    twice_split.split(3)
+    for dome in [GeodesicDome.from_frequency(8), twice_split]:
+        points, values = _points(50000, seed=dome.frequency)
+        nearest = np.argmax(points @ dome.welded_xyz.T, axis=1)
+        n = len(dome.welded_xyz)
+        assert np.array_equal(dome.bin(points, reducer='count'), np.bincount(nearest, minlength=n))
+        assert np.allclose(dome.bin(points, values[:, 0]), np.bincount(nearest, values[:, 0], minlength=n))
+        faces = dome.bin(points, reducer='count', on='face')
+        assert faces.sum() == len(points) and np.all(faces > 0)
+
+
+def test_bin_chunked_input_and_fields():
+    dome = GeodesicDome.from_frequency(4)
+    points, values = _points(8000, seed=1)
+    expected = dome.bin(points, values, reducer='mean')
+    assert expected.shape == (len(dome.welded_xyz), 2)
+
+    chunks = ((points[i:i + 1000], values[i:i + 1000]) for i in range(0, len(points), 1000))
+    result = dome.bin(chunks, reducer='mean', name='wind')
+    assert np.allclose(result, expected, equal_nan=True)
+    field = dome.fields['wind']
+    assert field.shape == (dome.get_number_of_vertices(), 2)
+    assert np.allclose(field, expected[dome.canonical_ids], equal_nan=True)
+
+    counts = dome.bin(iter([points[:10], points[10:]]), reducer='count', on='face', name='hits')
+    assert counts.sum() == len(points)
+    assert np.array_equal(dome.face_fields['hits'], counts)
+
+    dome.split(2)
+    assert 'wind' not in dome.fields
+
+
+def test_bin_skips_points_without_a_direction(caplog):
+    dome = GeodesicDome.from_frequency(3)
+    points, values = _points(3000, seed=2)
+    bad = points.copy()
+    bad[[5, 1200, 2999]] = [[0.0, 0.0, 0.0], [np.nan, 1.0, 0.0], [np.inf, 0.0, 0.0]]
+    good = np.ones(len(points), dtype=bool)
+    good[[5, 1200, 2999]] = False
+    expected = dome.bin(points[good], values[good], reducer='mean')
+
+    chunks = ((bad[i:i + 1000], values[i:i + 1000]) for i in range(0, len(points), 1000))
+    with caplog.at_level('WARNING'):
+        result = dome.bin(chunks, reducer='mean')
+    assert np.allclose(result, expected, equal_nan=True)
+    assert '3 points without a direction were not binned' in caplog.text
+    assert dome.bin(iter([bad[:1000], bad[1000:]]), reducer='count', on='face').sum() == len(points) - 3
+
+
+def test_bin_errors():
+    dome = GeodesicDome.from_frequency(2)
+    points, _ = _points(10)
+    with pytest.raises(ValueError):
+        dome.bin(points, reducer='median')
+    with pytest.raises(ValueError):
+        dome.bin(points, reducer='mean')
+    with pytest.raises(ValueError):
+        dome.bin(points, on='edge')
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+
+
+@pytest.mark.parametrize('frequency', [1, 2, 7])
+def test_areas_tile_the_sphere(frequency):
+    dome = GeodesicDome.from_frequency(frequency)
+    assert dome.face_areas.shape == (20 * frequency * frequency,)
+    assert dome.vertex_areas.shape == (10 * frequency * frequency + 2,)
+    assert np.isclose(dome.face_areas.sum(), 4 * np.pi, rtol=1e-13)
+    assert np.isclose(dome.vertex_areas.sum(), 4 * np.pi, rtol=1e-13)
+    assert np.all(dome.face_areas > 0) and np.all(dome.vertex_areas > 0)
+    # the 12 pentagons have the smallest cells
+    if frequency > 1:
+        pentagons = np.flatnonzero(np.diff(dome.adjacency()[0]) == 5)
+        assert sorted(np.argsort(dome.vertex_areas)[:12]) == pentagons.tolist()
+
+
+def test_vertex_areas_are_voronoi_cells():
+    dome = GeodesicDome.from_frequency(2)
+    points = np.random.default_rng(0).normal(size=(400000, 3))
+    nearest = np.argmax(points @ dome.welded_xyz.T, axis=1)
+    sampled = np.bincount(nearest, minlength=len(dome.welded_xyz)) / len(points) * 4 * np.pi
+    assert np.allclose(sampled, dome.vertex_areas, rtol=0.05)
+
+
+def test_edges_and_normals():
+    dome = GeodesicDome.from_frequency(4)
+    edges = dome.edges
+    assert edges.dtype == np.int32 and edges.shape == (30 * 16, 2) and np.all(edges[:, 0] < edges[:, 1])
+    indptr, indices = dome.adjacency()
+    assert sorted(map(tuple, edges.tolist())) == sorted((i, int(j)) for i in range(len(indptr) - 1)
+                                                         for j in indices[indptr[i]:indptr[i + 1]] if i < j)
+    xyz = dome.welded_xyz
+    chord = np.linalg.norm(xyz[edges[:, 0]] - xyz[edges[:, 1]], axis=1)
+    assert np.allclose(dome.edge_lengths, 2 * np.arcsin(chord / 2))
+    assert np.allclose(np.linalg.norm(dome.vertex_normals, axis=1), 1)
+    assert np.all(np.einsum('ij,ij->i', dome.vertex_normals, xyz) > 0.999)
+
+
+def test_geometry_cached_and_dropped_on_split():
+    dome = GeodesicDome.from_frequency(2)
+    areas = dome.face_areas
+    assert dome.face_areas is areas and not areas.flags.writeable
+    dome.split(3)
+    assert len(dome.face_areas) == 20 * 36 and len(dome.vertex_normals) == 10 * 36 + 2
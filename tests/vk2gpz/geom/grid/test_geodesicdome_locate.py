@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom import util
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+
+
+def _check_locate(dome, points, chunk_size=3000):
+    vertex_id, triangle_id, barycentrics = dome.locate(points, chunk_size=chunk_size)
+
+    assert np.all(barycentrics >= -1e-12)
+    assert np.allclose(barycentrics.sum(axis=1), 1)
+    corners = dome.xyz[dome.faces[triangle_id]]
+    unit = points / np.linalg.norm(points, axis=1, keepdims=True)
+    projected = np.einsum('ij,ijk->ik', barycentrics, corners)
+    assert np.allclose(projected / np.linalg.norm(projected, axis=1, keepdims=True), unit)
+    # the nearest of all the vertices
+    assert np.array_equal(vertex_id, np.argmax(unit @ dome.welded_xyz.T, axis=1))
+    return triangle_id
+
+
+@pytest.mark.parametrize('frequency', [1, 2, 5, 12])
+def test_locate_finds_the_containing_triangle(frequency):
+    dome = GeodesicDome.from_frequency(frequency)
+    triangle_id = _check_locate(dome, np.random.default_rng(frequency).normal(size=(20000, 3)))
+    # every triangle gets some points
+    if frequency <= 5:
+        assert len(np.unique(triangle_id)) == 20 * frequency * frequency
+
+
+def test_locate_on_domes_split_more_than_once():
+    # the vertices of these domes are off the lattice the first guess assumes
+    array_backed = GeodesicDome.from_frequency(2)
+    array_backed.split(3)
+    object_backed = GeodesicDome(2)
+    object_backed.split(3)
+    for dome in [array_backed, object_backed, GeodesicDome.from_frequency(3).refined(4)]:
+        _check_locate(dome, np.random.default_rng(dome.frequency).normal(size=(40000, 3)))
+
+
+def test_locate_vertices_and_latlon():
+    dome = GeodesicDome.from_frequency(6)
+    vertex_id, _, barycentrics = dome.locate(dome.welded_xyz)
+    assert np.array_equal(vertex_id, np.arange(len(dome.welded_xyz)))
+    assert np.allclose(barycentrics.max(axis=1), 1)
+
+    points = util.normalize(np.random.default_rng(0).normal(size=(1000, 3)))
+    latlon = util.xyz_to_latlong(points.T).T
+    expected = dome.locate(points)
+    for a, b in zip(dome.locate(latlon), expected):
+        assert np.allclose(a, b)
+
+
+def test_locate_points_without_a_direction():
+    dome = GeodesicDome.from_frequency(3)
+    points = np.array([[0.0, 0.0, 0.0], [np.nan, 1.0, 0.0], [1.0, 0.0, 0.0], [np.inf, 0.0, 0.0], [1e-310, 0.0, 0.0]])
+    with np.errstate(all='raise'):
+        vertex_id, triangle_id, barycentrics = dome.locate(points, chunk_size=2)
+    assert list(vertex_id[[0, 1, 3]]) == [-1] * 3 and list(triangle_id[[0, 1, 3]]) == [-1] * 3
+    assert np.all(np.isnan(barycentrics[[0, 1, 3]]))
+    expected = dome.locate(points[[2]])
+    for a, b in zip((vertex_id, triangle_id, barycentrics), expected):
+        assert np.array_equal(a[[2, 4]], np.concatenate([b, b]))
+
+    vertex_id, triangle_id, _ = dome.locate(np.array([[np.nan, 0.0], [0.2, 0.3]]))
+    assert vertex_id[0] == -1 and triangle_id[0] == -1 and vertex_id[1] >= 0
+
+
+@pytest.mark.parametrize('frequency', [1, 2])
+def test_locate_points_on_the_edges(frequency):
+    # the walk tries triangles whose planes the directions of these points lie in
+    dome = GeodesicDome.from_frequency(frequency)
+    ends = dome.welded_xyz[dome.edges]
+    points = np.concatenate([util.normalize(ends[:, 0] + ends[:, 1]), dome.welded_xyz])
+    with np.errstate(all='raise'):
+        vertex_id, triangle_id, barycentrics = dome.locate(util.xyz_to_latlong(points.T).T)
+    assert np.all(barycentrics >= -1e-12) and np.allclose(barycentrics.sum(axis=1), 1)
+    assert np.array_equal(vertex_id[len(ends):], np.arange(len(dome.welded_xyz)))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome, _barycentrics
+from vk2gpz.geom.grid.hierarchy import DomeHierarchy
+
+
+def test_refined_keeps_the_coarse_dome():
+    coarse = GeodesicDome.from_frequency(3)
+    xyz = coarse.xyz.copy()
+    fine = coarse.refined(4)
+    assert coarse.frequency == 3 and np.array_equal(coarse.xyz, xyz)
+    assert fine.frequency == 12 and fine.get_number_of_vertices() == GeodesicDome.from_frequency(12).get_number_of_vertices()
+
+
+@pytest.mark.parametrize('frequencies', [[1, 2], [2, 6, 12], [3, 12]])
+def test_level_maps(frequencies):
+    hierarchy = DomeHierarchy(frequencies)
+    assert len(hierarchy) == len(frequencies)
+    for i, level_map in enumerate(hierarchy.maps):
+        coarse, fine = hierarchy[i], hierarchy[i + 1]
+        assert coarse.frequency == frequencies[i] and fine.frequency == frequencies[i + 1]
+        assert level_map.coarse_to_fine.dtype == np.int32 and level_map.fine_to_coarse_face.dtype == np.int32
+        assert np.array_equal(fine.welded_xyz[level_map.coarse_to_fine], coarse.welded_xyz)
+
+        # every fine vertex is in its coarse triangle, next to its coarse vertex
+        a, b, c = np.moveaxis(coarse.welded_xyz[level_map.corners], 1, 0)
+        assert np.all(_barycentrics(fine.welded_xyz, a, b, c) >= -1e-12)
+        assert np.array_equal(level_map.corners, coarse.welded_faces[level_map.fine_to_coarse_face])
+        assert np.all(level_map.weights >= 0) and np.allclose(level_map.weights.sum(axis=1), 1)
+        assert np.array_equal(level_map.fine_to_coarse_vertex[level_map.coarse_to_fine],
+                              np.arange(len(coarse.welded_xyz)))
+
+
+def test_prolong_and_restrict():
+    hierarchy = DomeHierarchy([2, 4, 12])
+    coarse = np.random.default_rng(0).random((len(hierarchy[0].welded_xyz), 2))
+    fine = hierarchy.prolong(coarse, 0, 2)
+    assert fine.shape == (len(hierarchy[2].welded_xyz), 2)
+    assert np.array_equal(fine[hierarchy.coarse_to_fine(0, 2)], coarse)
+    assert np.array_equal(hierarchy.restrict(fine, 2, 0, method='injection'), coarse)
+
+    # the averages of constants and of the coordinates stay close
+    assert np.allclose(hierarchy.restrict(np.full(len(fine), 3.0), 2, 0), 3.0)
+    xyz = hierarchy.restrict(hierarchy[1].welded_xyz, 1)
+    assert np.allclose(xyz, hierarchy[0].welded_xyz, atol=0.05)
+    with pytest.raises(ValueError):
+        DomeHierarchy([4, 6])
+
+
+def test_locate_on_refined_levels():
+    hierarchy = DomeHierarchy([2, 4, 12])
+    for i, level_map in enumerate(hierarchy.maps):
+        coarse, fine = hierarchy[i], hierarchy[i + 1]
+        # the fine vertices moved a little towards the centre of their coarse triangle stay in it
+        centres = coarse.welded_xyz[level_map.corners].mean(axis=1)
+        points = fine.welded_xyz + 1e-6 * (centres - fine.welded_xyz)
+        vertex_id, triangle_id, barycentrics = coarse.locate(points)
+        assert np.array_equal(triangle_id, level_map.fine_to_coarse_face)
+        assert np.all(barycentrics >= 0)
+
+        points = np.random.default_rng(i).normal(size=(20000, 3))
+        vertex_id, _, barycentrics = fine.locate(points)
+        assert np.all(barycentrics >= -1e-12)
+        assert np.array_equal(vertex_id, np.argmax(points @ fine.welded_xyz.T, axis=1))
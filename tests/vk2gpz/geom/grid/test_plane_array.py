@@ -0,0 +1,104 @@
+import numpy as np
+
+from vk2gpz.geom.grid.plane import Plane, PlaneVertex, Lattice, Topology
+
+
+def test_vertices_created_on_demand():
+    plane = Plane(300, 200, Lattice.Hexagonal)
+    assert plane.get_number_of_vertices() == 60000
+    assert plane._all_vertices is None and not plane._vertices
+
+    v = plane.get_vertex_at(7, 3)
+    assert (v.x, v.y, v.id) == (7, 3, 3 * 300 + 7)
+    assert plane.get_vertex_at(7, 3) is v
+    assert plane.get_vertex_by_id(v.id) is v
+    assert len(plane._vertices) == 1
+
+    # the vertices created before are kept when all of them are
+    vertices = plane.get_all_vertices()
+    assert vertices[v.id] is v and plane.get_vertex_at(7, 3) is v
+    assert len(vertices) == 60000
+
+
+def test_coordinates_match_plane_vertex():
+    for lattice in Lattice:
+        plane = Plane(6, 5, lattice)
+        xyz = plane.get_all_xyz()
+        for i, v in enumerate(plane.get_all_vertices()):
+            assert np.array_equal(xyz[i], PlaneVertex(v.x, v.y, lattice)._initial_coord())
+            assert np.shares_memory(v.coord, xyz)
+
+
+def test_neighbours_without_all_vertices():
+    plane = Plane(50, 40, Lattice.Hexagonal, Topology.Donut)
+    v = plane.get_vertex_at(0, 1)
+    neighbours = plane.get_neighbours(v, False)
+    assert sorted((n.x, n.y) for n in neighbours) == [(0, 0), (0, 2), (1, 0), (1, 1), (1, 2), (49, 1)]
+    assert plane._all_vertices is None
+    plane.unmark_vertices()
+    assert not any(n.visited for n in neighbours) and not v.visited
+
+
+def _expected_neighbours(plane, i):
+    y, x = divmod(i, plane.x)
+    found = []
+    for n in plane._neighbour_indices(x, y):
+        if n != i and n not in found:
+            found.append(n)
+    return found
+
+
+def test_neighbour_table_matches_get_neighbours():
+    for lattice in Lattice:
+        for topology in Topology:
+            for x, y in [(1, 1), (2, 1), (1, 3), (2, 2), (3, 2), (2, 5), (3, 3), (7, 5), (6, 6)]:
+                plane = Plane(x, y, lattice, topology)
+                table = plane.neighbour_table()
+                assert table.dtype == np.int32 and table.shape == (x * y, 6 if lattice == Lattice.Hexagonal else 4)
+                indptr, indices = plane.adjacency()
+                for i in range(x * y):
+                    expected = _expected_neighbours(plane, i)
+                    row = list(table[i])
+                    assert row == expected + [-1] * (table.shape[1] - len(expected))
+                    assert list(indices[indptr[i]:indptr[i + 1]]) == expected
+                    plane.unmark_vertices()
+                    v = plane.get_vertex_by_id(i)
+                    assert [n.id for n in plane.get_neighbours(v, False)] == expected
+
+
+def test_ring_disk_and_distance_match_the_graph():
+    for lattice in Lattice:
+        for topology in Topology:
+            for x, y in [(1, 4), (2, 2), (3, 5), (6, 4), (7, 7), (12, 3)]:
+                plane = Plane(x, y, lattice, topology)
+                n = x * y
+                ids = np.arange(n)
+                expected = plane._graph_distance(np.repeat(ids, n), np.tile(ids, n)).reshape(n, n)
+                assert np.array_equal(plane.distance(ids[:, np.newaxis], ids), expected)
+                for seed in range(0, n, 3):
+                    disk = plane.disk(seed, 4)
+                    assert disk[0] == seed and len(set(disk.tolist())) == len(disk)
+                    assert sorted(disk.tolist()) == list(np.flatnonzero(expected[seed] <= 4))
+                    for k in range(1, 5):
+                        assert sorted(plane.ring(seed, k).tolist()) == list(np.flatnonzero(expected[seed] == k))
+
+
+def test_face_indices():
+    for lattice in Lattice:
+        for x, y in [(1, 1), (2, 2), (5, 4), (4, 7)]:
+            plane = Plane(x, y, lattice)
+            expected = []
+            for i in range(y - 1):
+                for j in range(x - 1):
+                    a, b, c, d = i * x + j, i * x + j + 1, (i + 1) * x + j + 1, (i + 1) * x + j
+                    if lattice == Lattice.Rectilinear:
+                        expected.append([a, b, c, d])
+                    elif i % 2 == 0:
+                        expected += [[a, b, d], [b, c, d]]
+                    else:
+                        expected += [[a, b, c], [a, c, d]]
+            faces = plane.face_indices()
+            assert faces.dtype == np.int32 and faces.shape == (len(expected), plane.get_number_of_vertices_per_face())
+            assert faces.tolist() == expected
+            assert plane.face_indices() is faces and not faces.flags.writeable
+            assert [v.id for v in plane.get_faces()] == faces.ravel().tolist()
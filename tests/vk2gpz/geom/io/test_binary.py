@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, Lattice
+from vk2gpz.geom.io import binary
+
+
+def test_round_trip_dome(tmp_path):
+    dome = GeodesicDome.from_frequency(5)
+    path = str(tmp_path / 'dome.vkm')
+    temperature = np.linspace(0, 1, dome.get_number_of_vertices())
+    binary.write_manifold(path, dome, fields={'temperature': temperature}, metadata={'frequency': 5})
+
+    mesh = binary.read(path)
+    assert mesh.metadata == {'frequency': 5}
+    assert isinstance(mesh.xyz, np.memmap) and not mesh.xyz.flags.writeable
+    assert np.array_equal(mesh.xyz, dome.get_all_xyz())
+    assert np.array_equal(mesh.faces, dome.face_indices())
+    assert np.array_equal(mesh.grid, dome.grid_xy)
+    assert np.array_equal(mesh.canonical_ids, dome.canonical_ids)
+    assert np.array_equal(mesh.fields['temperature'], temperature)
+    for name in ['xyz', 'faces', 'grid', 'canonical_ids', 'field:temperature']:
+        assert mesh.section(name).offset % 64 == 0
+
+
+def test_float32_plane(tmp_path):
+    plane = Plane(6, 5, Lattice.Rectilinear)
+    path = str(tmp_path / 'plane.vkm')
+    binary.write_manifold(path, plane, dtype=np.float32)
+    mesh = binary.read(path)
+    assert mesh.xyz.dtype == np.float32
+    assert np.array_equal(mesh.xyz, plane.get_all_xyz().astype(np.float32))
+    assert mesh.faces.shape == (20, 4)
+    assert mesh.canonical_ids is None and 'canonical_ids' not in mesh
+    assert list(mesh.grid[7]) == [1, 1]
+
+
+def test_chunked_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(binary, '_CHUNK_BYTES', 100)
+    xyz = np.random.default_rng(0).random((1000, 3))
+    faces = np.arange(3000, dtype=np.int64).reshape(-1, 3) % 1000
+    path = str(tmp_path / 'mesh.vkm')
+    binary.write(path, xyz, faces, fields={'empty': np.zeros((1000, 0))})
+    mesh = binary.read(path)
+    assert np.array_equal(mesh.xyz, xyz)
+    assert mesh.faces.dtype == np.int32 and np.array_equal(mesh.faces, faces)
+    assert mesh.fields['empty'].shape == (1000, 0)
+
+
+def test_bad_files(tmp_path):
+    path = str(tmp_path / 'bad.vkm')
+    with open(path, 'wb') as f:
+        f.write(b'OFF\n' + b'\0' * 64)
+    with pytest.raises(ValueError):
+        binary.read(path)
+    with pytest.raises(ValueError):
+        binary.write(path, np.zeros((1, 3)), np.zeros((0, 3)), dtype=np.int32)
+    with pytest.raises(ValueError):
+        binary.write(path, np.zeros((2, 3)), np.zeros((0, 3)), fields={'f': np.zeros(3)})
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, Lattice
+from vk2gpz.geom.io import formats
+from vk2gpz.geom.projection.kavrayskiy import KavrayskiyVII
+
+
+@pytest.mark.parametrize('format', ['off', 'ply', 'ply-binary'])
+def test_export_round_trip(tmp_path, format, monkeypatch):
+    monkeypatch.setattr(formats, '_CHUNK_ROWS', 50)
+    dome = GeodesicDome.from_frequency(4)
+    path = str(tmp_path / ('dome.' + format.split('-')[0]))
+    dome.export(path, format=format)
+    xyz, faces = formats.read(path)
+    assert np.array_equal(xyz, dome.get_all_xyz())
+    assert np.array_equal(faces, dome.face_indices())
+
+
+def test_export_obj(tmp_path):
+    plane = Plane(3, 2, Lattice.Rectilinear)
+    path = str(tmp_path / 'plane.obj')
+    plane.export(path, format='obj')
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == 'v 0.0 0.0 0.0'
+    assert lines[6:] == ['f 1 2 5 4', 'f 2 3 6 5']
+
+
+def test_export_off_matches_old_writer(tmp_path):
+    plane = Plane(4, 3)
+    path = str(tmp_path / 'plane.off')
+    plane.export(path)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[:3] == ['# OFF Data', 'OFF', '12 12 0']
+    for line, v in zip(lines[3:15], plane.get_all_vertices()):
+        assert line == f'{v.coord[0]} {v.coord[1]} {v.coord[2]}'
+    assert lines[15] == '3 ' + ' '.join(str(v.id) for v in plane.get_faces()[:3])
+
+
+def test_export_2d_coords(tmp_path):
+    dome = GeodesicDome.from_frequency(2)
+    path = str(tmp_path / 'grid.ply')
+    dome.export(path, format='ply-binary', coords='grid')
+    xyz, _ = formats.read_ply(path)
+    assert np.array_equal(xyz[:, :2], dome.grid_xy) and not xyz[:, 2].any()
+
+    projection = KavrayskiyVII()
+    dome.export(path, format='ply', coords=projection)
+    xyz, _ = formats.read_ply(path)
+    assert np.array_equal(xyz[:, :2], projection.project(dome.get_all_xyz()))
+
+    with pytest.raises(ValueError):
+        dome.export(path, coords='latlon')
+    with pytest.raises(ValueError):
+        dome.export(path, format='stl')
+
+
+def test_read_off_variants(tmp_path):
+    path = str(tmp_path / 'quad.off')
+    with open(path, 'w') as f:
+        f.write('OFF 4 1 0\n# vertices\n0 0 0 255 0 0\n1 0 0 255 0 0\n\n1 1 0 255 0 0\n0 1 0 255 0 0\n4 0 1 2 3\n')
+    xyz, faces = formats.read_off(path)
+    assert xyz.shape == (4, 3) and list(xyz[2]) == [1, 1, 0]
+    assert faces.tolist() == [[0, 1, 2, 3]]
+
+    with open(path, 'w') as f:
+        f.write('OFF\n4 2 0\n0 0 0\n1 0 0\n1 1 0\n0 1 0\n3 0 1 2\n4 0 1 2 3\n')
+    with pytest.raises(ValueError):
+        formats.read_off(path)
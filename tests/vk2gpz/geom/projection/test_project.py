@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from vk2gpz.geom import util
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.projection.equal_earth import EqualEarth
+from vk2gpz.geom.projection.kavrayskiy import KavrayskiyVII
+from vk2gpz.geom.projection.wagner import WagnerIII, WagnerVI
+
+
+@pytest.mark.parametrize('projection', [KavrayskiyVII(), WagnerVI(), WagnerIII(), EqualEarth()])
+def test_project_matches_xyz_to_2d(projection):
+    xyz = GeodesicDome.from_frequency(5).get_all_xyz()
+    expected = np.array([projection.xyz_to_2d(coord) for coord in xyz])
+    assert np.allclose(projection.project(xyz), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('projection', [KavrayskiyVII(), WagnerIII()])
+def test_build_matches_per_triangle_facing(projection):
+    dome = GeodesicDome.from_frequency(4)
+    visible = projection.build(dome)
+    expected = []
+    for face in dome.face_indices():
+        p1, p2, p3 = [projection.xyz_to_2d(dome.get_all_xyz()[i]) for i in face]
+        if np.cross(np.append(p2 - p1, 0), np.append(p3 - p2, 0))[2] > 0:
+            expected.append(face)
+    assert np.array_equal(visible, expected)
+    for v in dome.get_all_vertices():
+        assert np.allclose(v.projected_coord, projection.xyz_to_2d(v.coord))
+
+
+def test_facing():
+    assert util.facing(np.array([0, 0]), np.array([1, 0]), np.array([0, 1]))
+    assert not util.facing(np.array([0, 0]), np.array([0, 1]), np.array([1, 0]))
+    p = np.array([[[0, 0], [1, 0], [0, 1]], [[0, 0], [0, 1], [1, 0]]])
+    assert list(util.facing(p[:, 0], p[:, 1], p[:, 2])) == [True, False]
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+from vk2gpz.geom.cache import MeshCache
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, Lattice, Topology
+
+
+def test_dome_hit_matches_build(tmp_path):
+    cache = MeshCache(str(tmp_path))
+    built = cache.dome(6)
+    assert len(cache.entries()) == 1
+    loaded = cache.dome(6)
+    assert isinstance(loaded.get_all_xyz(), np.memmap)
+    expected = GeodesicDome.from_frequency(6)
+    assert loaded.frequency == 6 and loaded.x_max == 36
+    assert np.array_equal(loaded.get_all_xyz(), expected.get_all_xyz())
+    assert np.array_equal(loaded.faces, expected.faces)
+    assert np.array_equal(loaded.canonical_ids, expected.canonical_ids)
+    for a, b in zip(loaded.adjacency(), built.adjacency()):
+        assert np.array_equal(a, b)
+    assert [list(r) for r in loaded.k_ring(10, 2)] == [list(r) for r in expected.k_ring(10, 2)]
+    # the vertices are still there, and can still be moved
+    v = loaded.get_vertex_at(3, 2)
+    assert np.array_equal(v.coord, expected.get_vertex_at(3, 2).coord)
+    v.coord = [0.0, 0.0, 1.0]
+    loaded.split(2)
+    assert loaded.get_number_of_vertices() == GeodesicDome.from_frequency(12).get_number_of_vertices()
+
+
+def test_plane(tmp_path):
+    cache = MeshCache(str(tmp_path))
+    cache.plane(5, 4, Lattice.Rectilinear, Topology.Donut)
+    loaded = cache.plane(5, 4, Lattice.Rectilinear, Topology.Donut)
+    expected = Plane(5, 4, Lattice.Rectilinear, Topology.Donut)
+    assert np.array_equal(loaded.face_indices(), expected.face_indices())
+    assert np.array_equal(loaded.adjacency()[1], expected.adjacency()[1])
+    cache.plane(5, 4)
+    assert len(cache.entries()) == 2
+
+
+def _entry_size(tmp_path, frequency):
+    cache = MeshCache(str(tmp_path / str(frequency)))
+    cache.dome(frequency)
+    return cache.entries()[0][2]
+
+
+def test_lru_eviction(tmp_path):
+    size = _entry_size(tmp_path, 3) + _entry_size(tmp_path, 4)
+    tmp_path = tmp_path / 'cache'
+    cache = MeshCache(str(tmp_path))
+    cache.dome(2)
+    cache.dome(3)
+    first = MeshCache.key('GeodesicDome', {'frequency': 2})
+    os.utime(os.path.join(str(tmp_path), first, 'meta.json'), (0, 0))
+    cache.dome(3)  # a hit makes it the most recently used
+    cache.max_bytes = size + 64  # meta.json sizes differ by a few bytes between entries
+    cache.dome(4)
+    keys = {key for key, _, _ in cache.entries()}
+    assert keys == {MeshCache.key('GeodesicDome', {'frequency': 3}), MeshCache.key('GeodesicDome', {'frequency': 4})}
+
+
+def test_version_mismatch_is_a_miss(tmp_path):
+    cache = MeshCache(str(tmp_path))
+    cache.dome(2)
+    key = MeshCache.key('GeodesicDome', {'frequency': 2})
+    meta = os.path.join(str(tmp_path), key, 'meta.json')
+    with open(meta) as f:
+        text = f.read()
+    with open(meta, 'w') as f:
+        f.write(text.replace('"version": 1', '"version": 0'))
+    assert cache._load(key) is None
+    assert cache.entries() == []
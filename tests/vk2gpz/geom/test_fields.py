@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from vk2gpz.geom.fields import FieldStore
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, Lattice
+
+
+def test_create_and_validate():
+    store = FieldStore(4)
+    a = store.create('t', dtype=np.float32)
+    b = store.create('rgb', dtype=np.uint8, columns=3, fill=255)
+    assert a.shape == (4,) and a.dtype == np.float32
+    assert b.shape == (4, 3) and np.all(b == 255)
+    assert list(store) == ['t', 'rgb'] and len(store) == 2
+    with pytest.raises(ValueError):
+        store['bad'] = np.zeros(5)
+    del store['t']
+    assert 't' not in store
+
+
+def test_memmap_field_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'height.npy')
+        store = FieldStore(1000)
+        height = store.create('height', dtype=np.float32, path=path, fill=1.5)
+        assert isinstance(height, np.memmap)
+        height[10] = 7.0
+        store.flush()
+        snapshot = store.snapshot()
+        height[10] = 8.0
+        assert snapshot['height'][10] == 7.0 and not isinstance(snapshot['height'], np.memmap)
+
+        other = FieldStore(1000)
+        reopened = other.open('height', path, mode='r')
+        assert reopened[10] == 8.0 and reopened[0] == 1.5
+        with pytest.raises(ValueError):
+            FieldStore(10).open('height', path)
+
+
+def test_vertex_data_and_color_are_views_of_fields():
+    for manifold in [GeodesicDome.from_frequency(3), Plane(5, 4, Lattice.Rectilinear)]:
+        vertices = manifold.get_all_vertices()
+        # without fields the values stay on the vertices, as before
+        vertices[0].set_data({'any': 'object'})
+        assert vertices[0].data == {'any': 'object'}
+
+        data = manifold.fields.create('data')
+        color = manifold.fields.create('color', dtype=np.uint8, columns=3)
+        vertices[3].set_data(2.5)
+        vertices[3].color = (1, 2, 3)
+        assert data[3] == 2.5 and list(color[3]) == [1, 2, 3]
+        data[4] = 9.0
+        assert vertices[4].data == 9.0
+        assert vertices[0].data == 0.0
+
+
+def test_fields_dropped_on_split():
+    dome = GeodesicDome.from_frequency(2)
+    dome.fields.create('data')
+    dome.split(2)
+    assert 'data' not in dome.fields
+    assert len(dome.fields.create('data')) == dome.get_number_of_vertices()
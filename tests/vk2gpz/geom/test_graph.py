@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, Lattice, Topology
+
+
+def _bfs_rings(manifold, v, k):
+    manifold.unmark_vertices()
+    rings = [manifold.get_neighbours(v, False)]
+    for i in range(k - 1):
+        ring = []
+        for vTmp in rings[i]:
+            ring.extend(manifold.get_neighbours(vTmp, False))
+        rings.append(ring)
+    manifold.unmark_vertices()
+    return [sorted(manifold.get_vertex_id(n) for n in ring) for ring in rings]
+
+
+def test_k_ring_dome():
+    dome = GeodesicDome.from_frequency(4)
+    for v in dome.get_all_vertices()[::7]:
+        rings = dome.k_ring(v, 3)
+        assert [list(ring) for ring in rings] == _bfs_rings(dome, v, 3)
+    assert not any(v.visited for v in dome.get_all_vertices())
+
+
+def test_k_ring_plane():
+    for lattice in Lattice:
+        for topology in Topology:
+            plane = Plane(7, 6, lattice, topology)
+            for v in plane.get_all_vertices()[::5]:
+                assert [list(ring) for ring in plane.k_ring(v, 3)] == _bfs_rings(plane, v, 3)
+
+
+def test_get_neighbours_in_distance_needs_no_unmark():
+    plane = Plane(10, 10, Lattice.Hexagonal)
+    v = plane.get_vertex_at(4, 4)
+    first = plane.get_neighbours_in_distance(v, 2)
+    second = plane.get_neighbours_in_distance(v, 2)
+    assert [len(ring) for ring in first] == [6, 12]
+    assert first == second
+
+
+def test_k_ring_threads():
+    dome = GeodesicDome.from_frequency(8)
+    seeds = list(range(0, 600, 7))
+    expected = [[list(ring) for ring in dome.k_ring(seed, 4)] for seed in seeds]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda seed: [list(ring) for ring in dome.k_ring(seed, 4)], seeds))
+    assert results == expected
+    assert [len(ring) for ring in dome.k_ring(100, 2)] == [6, 12]
+    assert np.all(np.diff(dome.k_ring(100, 1)[0]) > 0)
+
+
+def test_k_rings_matches_k_ring():
+    manifolds = [GeodesicDome.from_frequency(5),
+                 Plane(7, 6, Lattice.Hexagonal, Topology.Donut),
+                 Plane(6, 5, Lattice.Rectilinear, Topology.Plane)]
+    for manifold in manifolds:
+        n = len(manifold.adjacency()[0]) - 1
+        for chunk_size in (None, 7):
+            ids, offsets, levels = manifold.k_rings(np.arange(n), 3, chunk_size=chunk_size)
+            assert len(offsets) == n + 1
+            for seed in range(n):
+                rings = manifold.k_ring(seed, 3)
+                assert list(ids[offsets[seed]:offsets[seed + 1]]) == list(np.concatenate(rings))
+                assert list(levels[offsets[seed]:offsets[seed + 1]]) == \
+                       [level + 1 for level, ring in enumerate(rings) for _ in ring]
+
+
+def test_k_rings_empty():
+    ids, offsets, levels = Plane(3, 3).k_rings([], 2)
+    assert len(ids) == len(levels) == 0
+    assert list(offsets) == [0]
@@ -0,0 +1,62 @@
+import numpy as np
+
+from vk2gpz.geom import util
+from vk2gpz.geom.grid.geodesicdome import GeodesicDome
+from vk2gpz.geom.grid.plane import Plane, PlaneVertex, Lattice
+from vk2gpz.geom.projection.kavrayskiy import KavrayskiyVII
+
+
+def test_coord_is_a_view_of_get_all_xyz():
+    for manifold in [GeodesicDome.from_frequency(3), GeodesicDome(3), Plane(5, 4, Lattice.Rectilinear)]:
+        xyz = manifold.get_all_xyz()
+        assert manifold.get_all_xyz() is xyz
+        assert xyz.shape == (manifold.get_number_of_vertices(), 3) and xyz.dtype == np.float64
+        for i, v in enumerate(manifold.get_all_vertices()):
+            assert np.shares_memory(v.coord, xyz)
+            assert np.array_equal(v.coord, xyz[i])
+        v = manifold.get_all_vertices()[2]
+        v.coord = [1.0, 2.0, 3.0]
+        assert list(xyz[2]) == [1.0, 2.0, 3.0]
+
+
+def test_buffers_follow_split():
+    dome = GeodesicDome(2)
+    before = dome.get_all_xyz().copy()
+    dome.split(2)
+    expected = GeodesicDome.from_frequency(2)
+    expected.split(2)
+    assert len(before) < len(dome.get_all_xyz())
+    assert np.array_equal(dome.get_all_xyz(), expected.get_all_xyz())
+    for i, v in enumerate(dome.get_all_vertices()):
+        assert np.shares_memory(v.coord, dome.get_all_xyz())
+
+
+def test_latlon_buffer():
+    dome = GeodesicDome.from_frequency(3)
+    latlon = dome.get_all_latlon()
+    assert latlon.shape == (dome.get_number_of_vertices(), 2)
+    for i, v in enumerate(dome.get_all_vertices()):
+        assert np.allclose(latlon[i], util.xyz_to_spherical(v.coord))
+        assert np.shares_memory(v.latlon_coord, latlon)
+
+
+def test_projected_buffer():
+    dome = GeodesicDome.from_frequency(2)
+    assert dome.get_all_projected() is None
+    projection = KavrayskiyVII()
+    projection.build(dome)
+    projected = dome.get_all_projected()
+    for i, v in enumerate(dome.get_all_vertices()):
+        assert np.array_equal(v.projected_coord, projection.xyz_to_2d(v.coord))
+        assert np.shares_memory(v.projected_coord, projected)
+
+
+def test_compact_vertices():
+    dome = GeodesicDome.from_frequency(2)
+    plane = Plane(4, 3)
+    for v in dome.get_all_vertices() + plane.get_all_vertices():
+        assert not hasattr(v, '__dict__')
+    for lattice in Lattice:
+        plane = Plane(4, 3, lattice)
+        for v in plane.get_all_vertices():
+            assert np.array_equal(v.coord, PlaneVertex(v.x, v.y, lattice).coord)